@@ -4,22 +4,59 @@ Simple Web UI for ZTP Bootstrap Service
 Lightweight Flask application for configuration and monitoring
 """
 
+import base64
+import calendar
+import functools
+import hashlib
+import heapq
+import hmac
+import http.client
+import ipaddress
+import itertools
 import json
 import logging
+import operator
 import os
 import re
 import secrets
+import shutil
+import stat
 import subprocess
+import sys
+import threading
 import time
-from collections import defaultdict
+import traceback
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import wraps
 from pathlib import Path
 
 import yaml
-from flask import Flask, jsonify, render_template, request, send_from_directory, session
+from flask import Flask, g, jsonify, render_template, request, send_file, send_from_directory, session
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.security import check_password_hash, generate_password_hash
 
+# Prefer the libyaml-backed C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as YamlSafeDumper
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeDumper as YamlSafeDumper
+    from yaml import SafeLoader as YamlSafeLoader
+
+# Use orjson for JSON encoding/decoding when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# fcntl is POSIX-only; it is used for reflink copies on Linux
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # Import security utilities
 try:
     from security_utils import (
@@ -29,22 +66,26 @@ try:
     )
 except ImportError:
     # Fallback if security_utils not available
+    BOOTSTRAP_FILENAME_RE = re.compile(r"^(?!.*\.\.)bootstrap[a-zA-Z0-9_.-]{0,120}\.py\Z")
+
     def sanitize_filename(filename):
         if not filename or not isinstance(filename, str):
             return None
         filename = Path(filename).name.replace("\x00", "")
-        if not re.match(r"^bootstrap[a-zA-Z0-9_.-]*\.py$", filename):
-            return None
-        if any(pattern in filename for pattern in ["..", "/", "\\"]):
+        if not BOOTSTRAP_FILENAME_RE.match(filename):
             return None
         return filename
 
+    @functools.lru_cache(maxsize=8)
+    def resolve_base_directory(base_directory):
+        return str(base_directory.resolve())
+
     def validate_path_in_directory(file_path, base_directory):
         try:
-            resolved_path = file_path.resolve()
-            resolved_base = base_directory.resolve()
+            resolved_path = str(file_path.resolve())
+            resolved_base = resolve_base_directory(base_directory)
             # Use os.path.commonpath to securely check for directory containment
-            return os.path.commonpath([str(resolved_path), str(resolved_base)]) == str(resolved_base)
+            return os.path.commonpath([resolved_path, resolved_base]) == resolved_base
         except (OSError, ValueError):
             return False
 
@@ -97,7 +138,25 @@ def safe_path_join(base_dir, filename):
     return result_path
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's UTF-8 bytes straight to the response instead of
+        # decoding to str for Flask to encode again; matters for large log bodies
+        obj = self._prepare_response_obj(args, kwargs)
+        data = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(data, mimetype=self.mimetype)
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 # Enable template auto-reload in production for development/testing
 app.config["TEMPLATES_AUTO_RELOAD"] = True
 
@@ -108,14 +167,174 @@ BOOTSTRAP_SCRIPT = CONFIG_DIR / 'bootstrap.py'
 NGINX_CONF = CONFIG_DIR / 'nginx.conf'
 SCRIPTS_METADATA = CONFIG_DIR / 'scripts_metadata.json'
 DEVICE_CONNECTIONS_FILE = CONFIG_DIR / 'device_connections.json'
-# Try shared volume first, then container path
-NGINX_ACCESS_LOG = Path('/var/log/nginx/ztpbootstrap_access.log')
-NGINX_ERROR_LOG = Path('/var/log/nginx/ztpbootstrap_error.log')
-# Fallback to config directory if mounted there
-if not NGINX_ACCESS_LOG.exists():
-    NGINX_ACCESS_LOG = CONFIG_DIR / 'logs' / 'ztpbootstrap_access.log'
-if not NGINX_ERROR_LOG.exists():
-    NGINX_ERROR_LOG = CONFIG_DIR / 'logs' / 'ztpbootstrap_error.log'
+NGINX_LOG_CURSOR_FILE = CONFIG_DIR / 'nginx_log_pos.json'
+# Seen-lines set kept by older versions, superseded by NGINX_LOG_CURSOR_FILE
+LEGACY_PROCESSED_LINES_FILE = CONFIG_DIR / 'processed_log_lines.txt'
+NGINX_LOG_DIR = Path('/var/log/nginx')
+_nginx_log_paths = {}
+
+def nginx_log_path(kind):
+    """Return the nginx 'access' or 'error' log path.
+
+    Prefers the shared volume and falls back to the config directory. The
+    lookup happens on first use rather than at import, and the shared volume
+    path is only pinned once it exists so late-created logs are picked up.
+    """
+    path = _nginx_log_paths.get(kind)
+    if path is not None:
+        return path
+    primary = NGINX_LOG_DIR / f'ztpbootstrap_{kind}.log'
+    if primary.exists():
+        _nginx_log_paths[kind] = primary
+        return primary
+    return CONFIG_DIR / 'logs' / f'ztpbootstrap_{kind}.log'
+
+def read_text_file(path):
+    """Read a UTF-8 text file with a single open and read"""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+# ioctl number for FICLONE (_IOW(0x94, 9, int)); older Pythons lack fcntl.FICLONE
+if fcntl is not None and sys.platform.startswith('linux'):
+    FICLONE = getattr(fcntl, 'FICLONE', 0x40049409)
+else:
+    FICLONE = None
+
+def fast_copy(src, dst):
+    """
+    Copy file contents and metadata, like shutil.copy2
+
+    On btrfs and XFS the FICLONE ioctl makes dst a reflink of src, sharing
+    all extents in one call. Otherwise os.copy_file_range copies inside the
+    kernel. When neither is available or supported for this pair of files,
+    shutil.copyfile (which uses sendfile on Linux) does the copy instead.
+
+    Raises shutil.SameFileError if src and dst are the same file, as
+    shutil.copy2 does; opening dst for writing would otherwise truncate src.
+    """
+    try:
+        same_file = os.path.samefile(src, dst)
+    except OSError:
+        # dst doesn't exist yet (or src doesn't, which open() reports below)
+        same_file = False
+    if same_file:
+        raise shutil.SameFileError(f'{src!r} and {dst!r} are the same file')
+    copied = False
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is not None or FICLONE is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                if FICLONE is not None:
+                    try:
+                        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                        remaining = 0
+                    except OSError:
+                        # Not a reflink-capable filesystem, or across filesystems
+                        pass
+                if remaining > 0 and copy_file_range is None:
+                    raise OSError('copy_file_range unavailable')
+                while remaining > 0:
+                    copied_bytes = copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied_bytes == 0:
+                        break
+                    remaining -= copied_bytes
+            copied = remaining <= 0
+        except OSError:
+            # EXDEV, ENOSYS, EOPNOTSUPP, ...; real errors resurface below
+            copied = False
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+def read_tail_lines(path, count):
+    """
+    Return the last `count` lines of a file as bytes
+
+    Reads a window from the end sized for `count` average lines and doubles
+    it until enough newlines are found, rather than reading the whole file.
+    Plain reads (not mmap) are used because these are logs that logrotate
+    may truncate underneath us: a short read is harmless, while touching
+    mapped pages past the new end of file raises SIGBUS.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or count <= 0:
+            return b''
+        window = min(size, count * 512)
+        while True:
+            f.seek(size - window)
+            data = f.read(window)
+            # Skip the newline terminating the last line
+            pos = len(data) - 1 if data.endswith(b'\n') else len(data)
+            for _ in range(count):
+                pos = data.rfind(b'\n', 0, pos)
+                if pos < 0:
+                    break
+            if pos >= 0 or window >= size:
+                return data[pos + 1:]
+            window = min(size, window * 2)
+
+def read_json_file(path):
+    """Load a JSON file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def write_json_file(path, obj, default=None, indent=True):
+    """Atomically write an object to a JSON file, with 2-space indentation unless indent is False"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        data = orjson.dumps(obj, default=default, option=option)
+    elif indent:
+        data = json.dumps(obj, indent=2, default=default).encode('utf-8')
+    else:
+        data = json.dumps(obj, separators=(',', ':'), default=default).encode('utf-8')
+    # Write to a temp file and rename so readers never see a partial file
+    temp_path = f'{path}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+# O_APPEND descriptors kept open by append_to_file, keyed by path
+_append_fds = {}
+_append_fds_lock = threading.Lock()
+
+def append_to_file(path, data):
+    """
+    Append bytes to an existing file through a cached O_APPEND descriptor
+
+    The descriptor is reopened when the path now names a different file
+    (log rotation). Raises FileNotFoundError if the file does not exist.
+    """
+    path = os.fspath(path)
+    with _append_fds_lock:
+        st = os.stat(path)
+        entry = _append_fds.get(path)
+        if entry is None or entry[1] != (st.st_dev, st.st_ino):
+            if entry is not None:
+                os.close(entry[0])
+                del _append_fds[path]
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CLOEXEC)
+            entry = _append_fds[path] = (fd, (st.st_dev, st.st_ino))
+        os.write(entry[0], data)
+
+def file_signature(path):
+    """Return (mtime_ns, size) for a file, or None if it cannot be stat'd"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
 # ============================================================================
 # Security Event Logging Configuration
@@ -172,9 +391,61 @@ def log_security_event(event_type, outcome, ip_address=None, details=None):
 # Authentication Configuration
 # ============================================================================
 
+# Memory-hard KDF for new admin password hashes (N=2**15, r=8, p=1)
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+
+def hash_password(password):
+    """Hash a password for storage in config.yaml"""
+    # Try werkzeug first, fall back to hashlib if not available
+    try:
+        return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+    except (ImportError, NameError):
+        # Fallback to hashlib format (same as setup script)
+        hash_bytes = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), b'ztpbootstrap', 100000)
+        hash_b64 = base64.b64encode(hash_bytes).decode('utf-8')
+        return f'pbkdf2:sha256:{hash_b64}'
+
+# Last loaded auth config, keyed by the config.yaml signature it was parsed from
+_auth_config_cache = (None, None)
+
+def parse_password_hash(password_hash):
+    """
+    Classify a stored password hash once so logins don't re-parse it
+
+    Returns (kind, decoded) where kind is 'fallback' for the
+    pbkdf2:sha256:<base64_hash> format written by setup-interactive.sh
+    (decoded holds the raw digest), 'werkzeug' for Werkzeug hashes, or None
+    when there is no usable hash.
+    """
+    if not password_hash:
+        return None, None
+    # Format: pbkdf2:sha256:<base64_hash> (no $ separator)
+    if password_hash.startswith('pbkdf2:sha256:') and '$' not in password_hash:
+        try:
+            return 'fallback', base64.b64decode(password_hash.split(':', 2)[2])
+        except ValueError:
+            return None, None
+    return 'werkzeug', None
+
+def _set_admin_password_hash(config, password_hash):
+    """Store a password hash on an auth config along with its parsed form"""
+    config['admin_password_hash'] = password_hash
+    config['admin_password_hash_kind'], config['admin_password_hash_decoded'] = parse_password_hash(password_hash)
+
 # Load authentication configuration
 def load_auth_config():
-    """Load authentication configuration from config.yaml or environment"""
+    """
+    Load authentication configuration from config.yaml or environment
+
+    The parsed result is cached and reused until config.yaml changes on disk,
+    so repeated logins don't re-read and re-parse the YAML file.
+    """
+    global _auth_config_cache
+    signature = file_signature(CONFIG_FILE)
+    cached_signature, cached_config = _auth_config_cache
+    if cached_config is not None and cached_signature == signature:
+        return cached_config
+
     config = {
         'admin_password_hash': None,
         'session_timeout': 3600,  # Default: 1 hour
@@ -182,10 +453,10 @@ def load_auth_config():
     }
 
     # Try to load from config.yaml
-    if CONFIG_FILE.exists():
+    if signature is not None:
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                yaml_config = yaml.safe_load(f)
+            with open(CONFIG_FILE, 'rb') as f:
+                yaml_config = yaml.load(f, Loader=YamlSafeLoader)
                 if yaml_config and 'auth' in yaml_config:
                     auth_config = yaml_config['auth']
                     if 'admin_password_hash' in auth_config:
@@ -203,12 +474,14 @@ def load_auth_config():
     env_password = os.environ.get('ZTP_ADMIN_PASSWORD')
     if env_password:
         # Hash the plain text password from environment
-        config['admin_password_hash'] = generate_password_hash(env_password)
+        config['admin_password_hash'] = hash_password(env_password)
+    _set_admin_password_hash(config, config['admin_password_hash'])
 
     # Generate session secret if not provided
     if not config['session_secret']:
         config['session_secret'] = secrets.token_hex(32)
 
+    _auth_config_cache = (signature, config)
     return config
 
 # Load auth config
@@ -216,10 +489,146 @@ AUTH_CONFIG = load_auth_config()
 
 # Function to reload auth config (useful after password changes)
 def reload_auth_config():
-    """Reload authentication configuration from config.yaml"""
+    """Reload authentication configuration from config.yaml (no-op if unchanged)"""
     global AUTH_CONFIG
     AUTH_CONFIG = load_auth_config()
 
+def update_admin_password_hash(password_hash):
+    """Update the in-memory admin password hash after config.yaml was rewritten"""
+    global AUTH_CONFIG, _auth_config_cache
+    if os.environ.get('ZTP_ADMIN_PASSWORD'):
+        # The environment override takes precedence over config.yaml
+        return
+    AUTH_CONFIG = dict(AUTH_CONFIG)
+    _set_admin_password_hash(AUTH_CONFIG, password_hash)
+    # Keep the load cache in step so the next login doesn't re-parse the file
+    _auth_config_cache = (file_signature(CONFIG_FILE), AUTH_CONFIG)
+
+def password_needs_rehash(auth_config):
+    """Return True if the admin password hash predates PASSWORD_HASH_METHOD"""
+    kind = auth_config['admin_password_hash_kind']
+    if kind == 'fallback':
+        return True
+    return kind == 'werkzeug' and not auth_config['admin_password_hash'].startswith(PASSWORD_HASH_METHOD + '$')
+
+# The indented admin_password_hash line under auth: in config.yaml
+_AUTH_HASH_RE = re.compile(r'^([ \t]+admin_password_hash:[ \t]*).*$', re.M)
+# Hash characters that can be written inside a double-quoted YAML scalar as-is
+_SAFE_HASH_RE = re.compile(r'[A-Za-z0-9$:+/=._-]+\Z')
+
+def write_admin_password_hash(password_hash):
+    """Store a new admin password hash in config.yaml and the in-memory auth config"""
+    password_hash = str(password_hash).strip()
+    with open(CONFIG_FILE, 'r') as f:
+        text = f.read()
+
+    # Replace just the hash line so comments and ordering are preserved
+    if _SAFE_HASH_RE.match(password_hash) and len(_AUTH_HASH_RE.findall(text)) == 1:
+        new_text = _AUTH_HASH_RE.sub(lambda m: f'{m.group(1)}"{password_hash}"', text)
+    else:
+        # Key missing or ambiguous: fall back to a full YAML round-trip
+        yaml_config = yaml.load(text, Loader=YamlSafeLoader) or {}
+
+        # Ensure auth section exists
+        if 'auth' not in yaml_config:
+            yaml_config['auth'] = {}
+        yaml_config['auth']['admin_password_hash'] = password_hash
+        new_text = yaml.dump(yaml_config, Dumper=YamlSafeDumper, default_flow_style=False,
+                             sort_keys=False, allow_unicode=True)
+
+    # Write back to file using atomic write (write to temp, fsync, then rename)
+    temp_file = CONFIG_FILE.with_suffix('.yaml.tmp')
+    try:
+        with open(temp_file, 'w') as f:
+            f.write(new_text)
+            f.flush()
+            os.fsync(f.fileno())
+        # Atomic rename
+        os.replace(temp_file, CONFIG_FILE)
+    except Exception:
+        # Clean up temp file on error
+        if temp_file.exists():
+            temp_file.unlink()
+        raise
+
+    # Use the hash we just wrote rather than re-reading the file
+    update_admin_password_hash(password_hash)
+
+# Signature of the config file when an upgrade last failed to write it (e.g. a
+# read-only mount), so logins don't redo the hash and the write until it changes
+_failed_hash_upgrade_signature = None
+
+def upgrade_admin_password_hash(password):
+    """Re-hash a legacy admin password with PASSWORD_HASH_METHOD after a successful login"""
+    global _failed_hash_upgrade_signature
+    if os.environ.get('ZTP_ADMIN_PASSWORD'):
+        # Environment passwords are re-hashed on every start; nothing to persist
+        return
+    signature = file_signature(CONFIG_FILE)
+    if signature is None or signature == _failed_hash_upgrade_signature:
+        return
+    try:
+        write_admin_password_hash(hash_password(password))
+        print("Upgraded admin password hash to scrypt", flush=True)
+    except Exception as e:
+        _failed_hash_upgrade_signature = signature
+        print(f"Warning: Failed to upgrade admin password hash: {type(e).__name__}: {e}", flush=True)
+
+# Password verification cache: maps (hash, peppered password digest) -> bool so
+# repeated guesses of the same password skip the 100k-iteration KDF. The pepper
+# is per-process and never persisted, so cached keys are useless outside it.
+_VERIFY_CACHE_PEPPER = secrets.token_bytes(32)
+_VERIFY_CACHE_SIZE = 1024
+_verify_cache = OrderedDict()
+_verify_cache_lock = threading.Lock()
+
+def _check_password(auth_config, password):
+    """Verify a password against a Werkzeug or setup-script fallback hash"""
+    kind = auth_config['admin_password_hash_kind']
+    if kind == 'fallback':
+        # Fallback format from setup-interactive.sh, decoded at config load
+        # Generate hash with same parameters (salt='ztpbootstrap', iterations=100000)
+        computed_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), b'ztpbootstrap', 100000)
+        return hmac.compare_digest(auth_config['admin_password_hash_decoded'], computed_hash)
+    if kind != 'werkzeug':
+        return False
+
+    # Use Werkzeug's standard format
+    try:
+        return check_password_hash(auth_config['admin_password_hash'], password)
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+def verify_password(auth_config, password):
+    """
+    Verify a password against the admin password hash of an auth config
+
+    Results are memoized in a small LRU cache keyed by the hash and a peppered
+    BLAKE2b digest of the password, so brute-force bursts that repeat the same
+    guesses only pay for the KDF once.
+    """
+    password_hash = auth_config['admin_password_hash']
+    if not password_hash or not isinstance(password, str):
+        return False
+
+    cache_key = (
+        password_hash,
+        hashlib.blake2b(password.encode('utf-8'), key=_VERIFY_CACHE_PEPPER, digest_size=16).digest(),
+    )
+    with _verify_cache_lock:
+        cached = _verify_cache.get(cache_key)
+        if cached is not None:
+            _verify_cache.move_to_end(cache_key)
+            return cached
+
+    result = _check_password(auth_config, password)
+
+    with _verify_cache_lock:
+        _verify_cache[cache_key] = result
+        if len(_verify_cache) > _VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+    return result
+
 # Configure Flask session
 app.secret_key = AUTH_CONFIG['session_secret']
 app.config['SESSION_COOKIE_HTTPONLY'] = True
@@ -228,51 +637,129 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = os.environ.get('HTTPS_ENABLED', 'false').lower() == 'true'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(seconds=AUTH_CONFIG['session_timeout'])
 
-# Rate limiting storage (simple in-memory dict)
+# Rate limiting storage (bounded in-memory dict keyed by rate_limit_key())
+# Entries expire lazily when their IP is looked up, and a min-heap of
+# (reset_time, seq, key) lets cleanup pop only the entries that are due
+# instead of scanning every tracked IP. The table is capped at MAX_TRACKED_IPS;
+# locked-out entries are never evicted to make room, so a flood of new
+# addresses cannot lift a lockout.
+MAX_TRACKED_IPS = 4096
+MAX_LOGIN_ATTEMPTS = 5
 login_attempts = {}
+login_attempts_lock = threading.Lock()
+_attempt_expiry_heap = []
+_attempt_expiry_seq = itertools.count()
+
+def rate_limit_key(ip):
+    """
+    Convert a client address into a compact rate limiting key
+
+    IP addresses become integers (IPv6 offset past the IPv4 range so the two
+    families can't collide), which hash in one step and also fold different
+    spellings of the same IPv6 address together. IPv6 clients are keyed by
+    their /64, since a single host can usually pick any address in it.
+    IPv4-mapped IPv6 addresses count as the IPv4 address. Anything
+    unparseable, such as 'unknown', is kept as-is.
+    """
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    if address.version == 6 and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+    if address.version == 4:
+        return int(address)
+    return (int(address) >> 64) | (1 << 128)
 
 def clean_old_attempts():
-    """Clean up old login attempts (older than 15 minutes)"""
-    cutoff = time.time() - 900  # 15 minutes
-    to_remove = [ip for ip, data in login_attempts.items() if data['reset_time'] < cutoff]
-    for ip in to_remove:
-        del login_attempts[ip]
+    """
+    Evict expired login attempts, then make room for one new entry if possible
 
-def is_rate_limited(ip):
+    When the table is full, the oldest entries that are not locked out are
+    evicted. Returns False if every tracked entry is locked out, in which case
+    there is no room and a new client can't be tracked.
     """
-    Check if IP is rate limited
+    now = time.time()
+    while _attempt_expiry_heap and _attempt_expiry_heap[0][0] <= now:
+        reset_time, _, key = heapq.heappop(_attempt_expiry_heap)
+        data = login_attempts.get(key)
+        # Skip stale heap entries whose key was reset or re-created since
+        if data is not None and data['reset_time'] == reset_time:
+            del login_attempts[key]
+    # Dicts preserve insertion order, so the first keys are the oldest entries
+    excess = len(login_attempts) - MAX_TRACKED_IPS + 1
+    if excess > 0:
+        evictable = list(itertools.islice(
+            (key for key, data in login_attempts.items() if data['attempts'] < MAX_LOGIN_ATTEMPTS),
+            excess))
+        for key in evictable:
+            del login_attempts[key]
+    # Entries evicted by the cap or reset by a successful login leave stale
+    # heap entries behind until their reset time; rebuild the heap from the
+    # live table once those outnumber it, so it stays bounded too
+    if len(_attempt_expiry_heap) > 2 * MAX_TRACKED_IPS:
+        _attempt_expiry_heap[:] = [
+            (data['reset_time'], next(_attempt_expiry_seq), key)
+            for key, data in login_attempts.items()
+        ]
+        heapq.heapify(_attempt_expiry_heap)
+    return len(login_attempts) < MAX_TRACKED_IPS
+
+def get_login_attempt(key):
+    """Get the rate limit entry for a key, dropping it if its window has expired"""
+    data = login_attempts.get(key)
+    if data is not None and data['reset_time'] <= time.time():
+        login_attempts.pop(key, None)
+        return None
+    return data
+
+def is_rate_limited(key):
+    """
+    Check if a client (by rate_limit_key()) is rate limited
 
     Rate limiting rules:
     - Maximum 5 failed attempts per 15 minutes
     - Lockout duration: 15 minutes from first failed attempt
     - Successful login resets the counter
     """
-    clean_old_attempts()
-    if ip in login_attempts:
-        data = login_attempts[ip]
-        if data['attempts'] >= 5 and time.time() < data['reset_time']:
-            return True
-    return False
+    with login_attempts_lock:
+        data = get_login_attempt(key)
+        if data is None:
+            # Clients that can't be tracked because the table is full of
+            # lockouts are refused until some of those expire
+            return len(login_attempts) >= MAX_TRACKED_IPS and not clean_old_attempts()
+        return data['attempts'] >= MAX_LOGIN_ATTEMPTS
+
+def record_login_attempt(key, success):
+    """Record a login attempt for a client (by rate_limit_key())"""
+    with login_attempts_lock:
+        if success:
+            # Reset on successful login
+            login_attempts.pop(key, None)
+            return
+
+        data = get_login_attempt(key)
+        if data is None:
+            if not clean_old_attempts():
+                # No room without dropping a lockout; is_rate_limited() refuses this client
+                return
+            # Reset time is 15 minutes from first failed attempt
+            data = login_attempts[key] = {'attempts': 0, 'reset_time': time.time() + 900}
+            heapq.heappush(_attempt_expiry_heap, (data['reset_time'], next(_attempt_expiry_seq), key))
 
-def record_login_attempt(ip, success):
-    """Record a login attempt"""
-    clean_old_attempts()
-    if ip not in login_attempts:
-        login_attempts[ip] = {'attempts': 0, 'reset_time': time.time() + 900}
-
-    if success:
-        # Reset on successful login
-        if ip in login_attempts:
-            del login_attempts[ip]
-    else:
         # Increment failed attempts
-        login_attempts[ip]['attempts'] += 1
-        # Reset time is 15 minutes from first failed attempt
-        if login_attempts[ip]['attempts'] == 1:
-            login_attempts[ip]['reset_time'] = time.time() + 900
+        data['attempts'] += 1
 
 def is_authenticated():
-    """Check if current session is authenticated"""
+    """Check if current session is authenticated (memoized per request on flask.g)"""
+    cached = g.get('_authenticated')
+    if cached is not None:
+        return cached
+    g._authenticated = _check_session_authenticated()
+    return g._authenticated
+
+def _check_session_authenticated():
+    """Check the session cookie for a live, authenticated session"""
     if 'authenticated' not in session:
         return False
     if not session['authenticated']:
@@ -285,18 +772,31 @@ def is_authenticated():
             return False
     return True
 
+# CSRF tokens are HMAC-SHA256 over a unique per-process nonce, keyed with a
+# random secret drawn once at startup, so minting a token for each new session
+# is a cheap in-process hash rather than another read from the OS RNG
+_CSRF_KEY = secrets.token_bytes(32)
+_csrf_counter = itertools.count()
+
 def generate_csrf_token():
     """Generate a CSRF token for the current session"""
     if "csrf_token" not in session:
-        session["csrf_token"] = secrets.token_hex(32)
+        nonce = f"{os.getpid()}:{next(_csrf_counter)}:{time.time_ns()}".encode()
+        session["csrf_token"] = hmac.new(_CSRF_KEY, nonce, hashlib.sha256).hexdigest()
     return session["csrf_token"]
 
 
 def validate_csrf_token(token):
     """Validate a CSRF token"""
-    if "csrf_token" not in session:
+    stored = session.get("csrf_token")
+    # Reject missing, non-string and wrong-length tokens before comparing;
+    # the token length is public, so this leaks nothing
+    if not stored or not isinstance(token, str) or len(token) != len(stored):
+        return False
+    try:
+        return hmac.compare_digest(stored.encode("ascii"), token.encode("ascii"))
+    except UnicodeEncodeError:
         return False
-    return secrets.compare_digest(session["csrf_token"], token)
 
 
 def require_auth(f):
@@ -351,22 +851,22 @@ def auth_status():
 @app.route('/api/auth/login', methods=['POST'])
 def auth_login():
     """Login endpoint"""
-    # Reload auth config on each login attempt to pick up password changes
+    # Pick up password changes (only re-parses config.yaml if it changed)
     reload_auth_config()
     try:
         # Get client IP
         client_ip = request.remote_addr or 'unknown'
+        attempt_key = rate_limit_key(client_ip)
 
         # Check rate limiting
-        if is_rate_limited(client_ip):
+        if is_rate_limited(attempt_key):
             # Log security event
             log_security_event('login', 'failure', client_ip, 'reason=rate_limited')
 
             # Calculate remaining lockout time
-            if client_ip in login_attempts:
-                remaining_time = int(
-                    login_attempts[client_ip]["reset_time"] - time.time()
-                )
+            attempt = login_attempts.get(attempt_key)
+            if attempt is not None:
+                remaining_time = int(attempt["reset_time"] - time.time())
                 remaining_minutes = max(0, remaining_time // 60)
                 return jsonify(
                     {
@@ -390,7 +890,7 @@ def auth_login():
         # Get password from request
         data = request.get_json()
         if not data or 'password' not in data:
-            record_login_attempt(client_ip, False)
+            record_login_attempt(attempt_key, False)
             return jsonify({
                 'error': 'Password is required',
                 'code': 'MISSING_PASSWORD'
@@ -399,42 +899,20 @@ def auth_login():
         password = data['password']
 
         # Verify password
-        # Handle both Werkzeug format and fallback format from setup script
-        password_hash = AUTH_CONFIG['admin_password_hash']
-        password_valid = False
-
-        # Check if this is the fallback format from setup-interactive.sh
-        # Format: pbkdf2:sha256:<base64_hash> (no $ separator)
-        if password_hash and password_hash.startswith('pbkdf2:sha256:') and '$' not in password_hash:
-            # Use fallback format verification
-            # lgtm[py/path-injection]
-            # CodeQL: password_hash comes from config file (trusted source), not user input
-            import base64
-            import hashlib
-            try:
-                # Extract the base64 hash
-                hash_part = password_hash.split(':', 2)[2]
-                # Decode the base64 hash
-                stored_hash = base64.b64decode(hash_part)
-                # Generate hash with same parameters (salt='ztpbootstrap', iterations=100000)
-                computed_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), b'ztpbootstrap', 100000)
-                password_valid = (stored_hash == computed_hash)
-            except Exception:
-                password_valid = False
-        else:
-            # Use Werkzeug's standard format
-            try:
-                password_valid = check_password_hash(password_hash, password)
-            except (ValueError, TypeError):
-                password_valid = False
+        # Handles both Werkzeug format and fallback format from setup script
+        password_valid = verify_password(AUTH_CONFIG, password)
 
         if password_valid:
             # Successful login
-            record_login_attempt(client_ip, True)
+            record_login_attempt(attempt_key, True)
 
             # Log security event
             log_security_event('login', 'success', client_ip, 'user=admin')
 
+            # Transparently move legacy PBKDF2 hashes to the memory-hard KDF
+            if password_needs_rehash(AUTH_CONFIG):
+                upgrade_admin_password_hash(password)
+
             # Create session
             session['authenticated'] = True
             session['login_time'] = time.time()
@@ -453,7 +931,7 @@ def auth_login():
             )
         else:
             # Failed login
-            record_login_attempt(client_ip, False)
+            record_login_attempt(attempt_key, False)
 
             # Log security event
             log_security_event('login', 'failure', client_ip, 'user=admin reason=invalid_password')
@@ -497,30 +975,8 @@ def auth_change_password():
                 'code': 'PASSWORD_TOO_SHORT'
             }), 400
 
-        # Declare global before using it
-        global AUTH_CONFIG
-
         # Verify current password
-        password_hash = AUTH_CONFIG['admin_password_hash']
-        password_valid = False
-
-        # Check if this is the fallback format from setup-interactive.sh
-        if password_hash and password_hash.startswith('pbkdf2:sha256:') and '$' not in password_hash:
-            import base64
-            import hashlib
-            try:
-                hash_part = password_hash.split(':', 2)[2]
-                stored_hash = base64.b64decode(hash_part)
-                computed_hash = hashlib.pbkdf2_hmac('sha256', current_password.encode('utf-8'), b'ztpbootstrap', 100000)
-                password_valid = (stored_hash == computed_hash)
-            except Exception:
-                password_valid = False
-        else:
-            # Use werkzeug's check_password_hash (imported at top of file)
-            try:
-                password_valid = check_password_hash(password_hash, current_password)
-            except (ValueError, TypeError, AttributeError):
-                password_valid = False
+        password_valid = verify_password(AUTH_CONFIG, current_password)
 
         if not password_valid:
             return jsonify({
@@ -529,85 +985,15 @@ def auth_change_password():
             }), 401
 
         # Generate new password hash
-        # Try werkzeug first, fall back to hashlib if not available
-        try:
-            new_password_hash = generate_password_hash(new_password)
-        except (ImportError, NameError):
-            # Fallback to hashlib format (same as setup script)
-            import base64
-            import hashlib
-            hash_bytes = hashlib.pbkdf2_hmac('sha256', new_password.encode('utf-8'), b'ztpbootstrap', 100000)
-            hash_b64 = base64.b64encode(hash_bytes).decode('utf-8')
-            new_password_hash = f'pbkdf2:sha256:{hash_b64}'
+        new_password_hash = hash_password(new_password)
 
         # Update config.yaml
         if CONFIG_FILE.exists():
             try:
-                # Read current config
-                with open(CONFIG_FILE, 'r') as f:
-                    yaml_config = yaml.safe_load(f) or {}
-
-                # Ensure auth section exists
-                if 'auth' not in yaml_config:
-                    yaml_config['auth'] = {}
-
-                # Update password hash (ensure it's a string and properly formatted)
-                # Werkzeug hashes contain special characters ($, :) that need proper handling
-                yaml_config['auth']['admin_password_hash'] = str(new_password_hash).strip()
-
-                # Write back to file using atomic write (write to temp, then rename)
-                import shutil
-                import tempfile
-                temp_file = CONFIG_FILE.with_suffix('.yaml.tmp')
-                try:
-                    with open(temp_file, 'w') as f:
-                        yaml.dump(yaml_config, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-                    # Atomic rename
-                    temp_file.replace(CONFIG_FILE)
-                except Exception as e:
-                    # Clean up temp file on error
-                    if temp_file.exists():
-                        temp_file.unlink()
-                    raise e
-
-                # Reload auth config using the reload function
-                reload_auth_config()
-
-                # Verify the new hash was loaded correctly
-                loaded_hash = AUTH_CONFIG.get('admin_password_hash')
-                expected_hash = str(new_password_hash).strip()
-                test_result = False
-
-                if loaded_hash != expected_hash:
-                    # Hash format might differ but still be valid (e.g., werkzeug generates different formats)
-                    # Still try to verify the password works with the loaded hash
-                    pass
-
-                # Verify the new password works with the loaded hash
-                if loaded_hash:
-                    try:
-                        # Use check_password_hash imported at top of file
-                        test_result = check_password_hash(loaded_hash, new_password)
-                    except (ImportError, NameError, AttributeError):
-                        # Fallback format verification
-                        if loaded_hash.startswith('pbkdf2:sha256:') and '$' not in loaded_hash:
-                            import base64
-                            import hashlib
-                            try:
-                                hash_part = loaded_hash.split(':', 2)[2]
-                                stored_hash = base64.b64decode(hash_part)
-                                computed_hash = hashlib.pbkdf2_hmac('sha256', new_password.encode('utf-8'), b'ztpbootstrap', 100000)
-                                test_result = (stored_hash == computed_hash)
-                            except Exception:
-                                test_result = False
-
-                if not test_result:
-                    print(f"ERROR: New password hash verification failed after reload!", flush=True)
-
+                write_admin_password_hash(new_password_hash)
                 return jsonify({'success': True})
             except Exception as e:
                 # Log detailed error for debugging
-                import traceback
                 print(f"Error updating password in config.yaml: {type(e).__name__}: {e}", flush=True)
                 print(f"Traceback: {traceback.format_exc()}", flush=True)
                 return jsonify({
@@ -621,7 +1007,6 @@ def auth_change_password():
             }), 404
     except Exception as e:
         # Log detailed error for debugging
-        import traceback
         print(f"Change password error: {type(e).__name__}: {e}", flush=True)
         print(f"Traceback: {traceback.format_exc()}", flush=True)
         return jsonify({
@@ -649,43 +1034,70 @@ def serve_image(filename):
     except FileNotFoundError:
         return "Image not found", 404
 
+# Last /api/config payload, keyed by the config.yaml signature it was built from
+_config_response_cache = (None, None)
+
 @app.route('/api/config')
 @require_auth
 def get_config():
     """Get current configuration (requires authentication due to sensitive data)"""
+    global _config_response_cache
     try:
-        if CONFIG_FILE.exists():
-            raw_content = CONFIG_FILE.read_text()
+        signature = file_signature(CONFIG_FILE)
+        if signature is not None:
+            cached_signature, cached_response = _config_response_cache
+            if cached_response is not None and cached_signature == signature:
+                return jsonify(cached_response)
+
+            # One open: fstat the fd for the cache key, read the bytes once and
+            # hand them straight to the parser
+            with open(CONFIG_FILE, 'rb') as f:
+                st = os.fstat(f.fileno())
+                raw_bytes = f.read()
+            signature = (st.st_mtime_ns, st.st_size)
+            raw_content = raw_bytes.decode('utf-8')
             # Try to parse YAML using PyYAML
             try:
-                parsed_config = yaml.safe_load(raw_content)
-                return jsonify({'parsed': parsed_config, 'raw': raw_content})
+                parsed_config = yaml.load(raw_bytes, Loader=YamlSafeLoader)
+                response = {'parsed': parsed_config, 'raw': raw_content}
             except yaml.YAMLError as e:
                 # YAML parsing failed, return raw content
-                return jsonify({'raw': raw_content, 'parsed': None, 'error': 'YAML parse error: Invalid configuration file format'})
+                response = {'raw': raw_content, 'parsed': None, 'error': 'YAML parse error: Invalid configuration file format'}
+            _config_response_cache = (signature, response)
+            return jsonify(response)
         else:
             return jsonify({'error': 'Config file not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Last loaded scripts metadata, keyed by the file signature it was read from
+_scripts_metadata_cache = (None, None)
+
 def load_scripts_metadata():
-    """Load scripts metadata from JSON file"""
-    if SCRIPTS_METADATA.exists():
+    """Load scripts metadata from JSON file (cached until the file changes)"""
+    global _scripts_metadata_cache
+    signature = file_signature(SCRIPTS_METADATA)
+    if signature is None:
+        return {}
+    cached_signature, cached_metadata = _scripts_metadata_cache
+    if cached_metadata is None or cached_signature != signature:
         try:
-            with open(SCRIPTS_METADATA, 'r') as f:
-                return json.load(f)
+            cached_metadata = read_json_file(SCRIPTS_METADATA)
         except:
             return {}
-    return {}
+        _scripts_metadata_cache = (signature, cached_metadata)
+    # Callers edit the returned dict before saving it, so hand out a copy
+    return dict(cached_metadata)
 
 def save_scripts_metadata(metadata):
     """Save scripts metadata to JSON file"""
+    global _scripts_metadata_cache
     # lgtm[py/path-injection]
     # CodeQL: SCRIPTS_METADATA is a trusted path constructed from CONFIG_DIR (environment variable)
     # It is not user-controlled and is safe to use
     try:
-        with open(SCRIPTS_METADATA, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_json_file(SCRIPTS_METADATA, metadata)
+        _scripts_metadata_cache = (file_signature(SCRIPTS_METADATA), dict(metadata))
         return True
     except Exception as e:
         print(f"Error saving metadata: {e}")
@@ -694,123 +1106,157 @@ def save_scripts_metadata(metadata):
 def cleanup_old_backups():
     """Keep only the 5 most recent backup files, delete older ones"""
     try:
-        script_dir = CONFIG_DIR
-        backup_files = []
+        # Single directory pass keeping the 5 newest backups in a min-heap;
+        # anything pushed out of the heap is older than all 5 survivors
+        newest = []
+        stale = []
+        with os.scandir(CONFIG_DIR) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith('bootstrap_backup_') and name.endswith('.py')):
+                    continue
+                try:
+                    item = (entry.stat().st_mtime, name)
+                except OSError:
+                    continue
+                if len(newest) < 5:
+                    heapq.heappush(newest, item)
+                else:
+                    stale.append(heapq.heappushpop(newest, item)[1])
 
-        # Find all backup files
-        for file in script_dir.glob('bootstrap_backup_*.py'):
+        for name in stale:
             try:
-                backup_files.append((file.stat().st_mtime, file))
-            except OSError:
-                continue
-
-        # Sort by modification time (newest first)
-        backup_files.sort(key=lambda x: x[0], reverse=True)
-
-        # Keep only the 5 most recent, delete the rest
-        if len(backup_files) > 5:
-            for mtime, backup_file in backup_files[5:]:
-                try:
-                    backup_file.unlink()
-                    print(f"Deleted old backup: {backup_file.name}")
-                except OSError as e:
-                    print(f"Error deleting backup {backup_file.name}: {e}")
+                (CONFIG_DIR / name).unlink()
+                print(f"Deleted old backup: {name}")
+            except OSError as e:
+                print(f"Error deleting backup {name}: {e}")
     except Exception as e:
         print(f"Error cleaning up backups: {e}")
 
+def lstat_or_none(path):
+    """Return os.lstat(path), or None if nothing exists at path"""
+    try:
+        return os.lstat(path)
+    except FileNotFoundError:
+        return None
+
+def is_same_file(path, other):
+    """Return True if both paths (after following symlinks) are the same file"""
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+# Resolved active script, keyed by the lstat of bootstrap.py it was derived from
+_active_script_cache = (None, None)
+
+def get_active_script():
+    """
+    Return the resolved path of the active bootstrap script, or None
+
+    bootstrap.py is either the active script itself or a symlink to it. The
+    resolution is cached until bootstrap.py is replaced, so the script
+    endpoints don't walk the symlink on every request.
+    """
+    global _active_script_cache
+    try:
+        st = os.lstat(BOOTSTRAP_SCRIPT)
+    except OSError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns, st.st_ctime_ns)
+    cached_key, cached_path = _active_script_cache
+    if cached_key == key:
+        return cached_path
+    try:
+        active = BOOTSTRAP_SCRIPT.resolve(strict=True)
+    except (OSError, RuntimeError):
+        # Dangling symlink or symlink loop: nothing is active
+        return None
+    _active_script_cache = (key, active)
+    return active
+
+# Last script listing as (key, (expires_at, response data)); the key is the
+# config directory mtime plus the lstat of bootstrap.py, which change on every
+# add, remove, rename and re-point. The TTL bounds staleness of the listed
+# size/mtime when a script is rewritten in place.
+_scripts_list_cache = (None, None)
+SCRIPTS_LIST_CACHE_TTL = 10
+
+def scripts_list_key():
+    """Return the cache key for the script listing, or None if it cannot be computed"""
+    try:
+        dir_stat = os.stat(CONFIG_DIR)
+    except OSError:
+        return None
+    try:
+        link_stat = os.lstat(BOOTSTRAP_SCRIPT)
+        link_key = (link_stat.st_ino, link_stat.st_mtime_ns, link_stat.st_ctime_ns)
+    except OSError:
+        link_key = None
+    return (dir_stat.st_mtime_ns, link_key)
+
+def invalidate_scripts_list():
+    """Drop the cached script listing"""
+    global _scripts_list_cache
+    _scripts_list_cache = (None, None)
+
 @app.route('/api/bootstrap-scripts')
 def list_bootstrap_scripts():
     """List available bootstrap scripts"""
+    global _scripts_list_cache
+    key = scripts_list_key()
+    cached_key, cached_listing = _scripts_list_cache
+    if key is not None and cached_key == key and cached_listing[0] > time.monotonic():
+        return jsonify(cached_listing[1])
+
     scripts = []
+    seen = set()
     script_dir = CONFIG_DIR
     active_script = None
     metadata = load_scripts_metadata()
 
-    # Check which script is currently active (bootstrap.py is the active one)
-    active_path = BOOTSTRAP_SCRIPT
-    if active_path.exists():
-        if active_path.is_symlink():
-            # Resolve symlink to get the actual target file
-            try:
-                resolved = active_path.resolve()
-                active_script = resolved.name
-            except:
-                active_script = active_path.name
-        else:
-            # bootstrap.py is a regular file, so it's the active one
-            active_script = active_path.name
-
-    # Get the resolved path and name of the active script for comparison
-    active_resolved_path = None
-    active_resolved_name = None
-    if active_script:
-        try:
-            active_file = script_dir / active_script
-            if active_file.exists():
-                active_resolved_path = active_file.resolve()
-                active_resolved_name = active_resolved_path.name
-        except:
-            pass
-
-    for file in script_dir.glob('bootstrap*.py'):
-        # Skip backup files (they shouldn't be shown in the UI)
-        if file.name.startswith('bootstrap_backup_'):
-            continue
+    # Check which script is currently active (bootstrap.py or its symlink target)
+    active_path = get_active_script()
+    if active_path is not None:
+        active_script = active_path.name
+
+    # One directory pass; DirEntry carries the name and file type from readdir
+    with os.scandir(script_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            # Skip non-scripts and backup files (they shouldn't be shown in the UI)
+            if not (name.startswith('bootstrap') and name.endswith('.py')) or name.startswith('bootstrap_backup_'):
+                continue
 
-        # Skip symlink loops (symlinks pointing to themselves)
-        try:
-            if file.is_symlink():
-                resolved = file.resolve()
-                if resolved == file:
-                    # Symlink loop detected, skip this file
-                    continue
-        except (OSError, RuntimeError):
-            # Error resolving symlink (loop or broken), skip this file
-            continue
-
-        # Only mark as active if this file's NAME matches the resolved target name
-        # This ensures only the actual target file is marked active, not the symlink
-        is_active = False
-        if active_resolved_name:
-            # Compare by name, not by resolved path, to avoid marking symlinks as active
-            is_active = file.name == active_resolved_name
-        else:
-            is_active = file.name == active_script
+            # Only mark as active if this file's NAME matches the resolved target name
+            # This ensures only the actual target file is marked active, not the symlink
+            is_active = name == active_script
 
-        try:
-            # For bootstrap.py, if it's a symlink, we still want to show it
-            # but we'll mark the target as active instead
-            file_stat = file.stat()
-            script_meta = metadata.get(file.name, {})
-            scripts.append({
-                'name': file.name,
-                'path': str(file),
-                'size': file_stat.st_size,
-                'modified': file_stat.st_mtime,
-                'active': is_active
-            })
-        except OSError as e:
-            # Skip files that can't be stat'd (e.g., symlink loops)
-            continue
+            try:
+                # For bootstrap.py, if it's a symlink, we still want to show it
+                # but we'll mark the target as active instead. stat() follows
+                # symlinks, so loops and dangling links raise and are skipped.
+                file_stat = entry.stat()
+                script_meta = metadata.get(name, {})
+                scripts.append({
+                    'name': name,
+                    'path': entry.path,
+                    'size': file_stat.st_size,
+                    'modified': file_stat.st_mtime,
+                    'active': is_active
+                })
+                seen.add(name)
+            except OSError as e:
+                # Skip files that can't be stat'd (e.g., symlink loops)
+                continue
 
     # Always include bootstrap.py in the list if it exists (even as symlink)
     # This ensures it's visible even when it's a symlink to another file
     bootstrap_py_path = script_dir / 'bootstrap.py'
-    if bootstrap_py_path.exists() and not any(s['name'] == 'bootstrap.py' for s in scripts):
+    if 'bootstrap.py' not in seen:
         try:
-            is_active = False
-            if active_resolved_name:
-                # If bootstrap.py is a symlink, check if its target matches
-                if bootstrap_py_path.is_symlink():
-                    try:
-                        resolved = bootstrap_py_path.resolve()
-                        is_active = resolved.name == active_resolved_name
-                    except:
-                        pass
-                else:
-                    is_active = 'bootstrap.py' == active_resolved_name
-            else:
-                is_active = 'bootstrap.py' == active_script
+            # bootstrap.py itself is only active when it is a regular file
+            is_active = 'bootstrap.py' == active_script
 
             file_stat = bootstrap_py_path.stat()
             script_meta = metadata.get('bootstrap.py', {})
@@ -827,7 +1273,9 @@ def list_bootstrap_scripts():
     # Sort scripts: active script first, then by name
     scripts.sort(key=lambda x: (not x['active'], x['name']))
 
-    return jsonify({'scripts': scripts, 'active': active_script})
+    data = {'scripts': scripts, 'active': active_script}
+    _scripts_list_cache = (key, (time.monotonic() + SCRIPTS_LIST_CACHE_TTL, data))
+    return jsonify(data)
 
 @app.route('/api/bootstrap-script/<filename>')
 def get_bootstrap_script(filename):
@@ -854,27 +1302,59 @@ def get_bootstrap_script(filename):
             return jsonify({'error': 'Script not found'}), 404
 
         # Check if this script is the active one
-        active_path = BOOTSTRAP_SCRIPT
-        is_active = False
-        if active_path.exists():
-            try:
-                if active_path.is_symlink():
-                    is_active = script_path.resolve() == active_path.resolve()
-                else:
-                    is_active = script_path.name == active_path.name
-            except:
-                is_active = script_path.name == active_path.name
+        active_path = get_active_script()
+        is_active = active_path is not None and is_same_file(script_path, active_path)
+
+        # Weak validator from size, mtime and active flag; a re-poll of an
+        # unchanged script skips the read and JSON encode
+        st = script_path.stat()
+        etag = f'{st.st_size}-{st.st_mtime_ns}-{int(is_active)}'
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        data = {
+            "name": sanitized_filename,
+            "path": str(script_path),
+            "active": is_active,
+        }
+        # ?content=0 returns metadata only; the body is served by the /raw endpoint
+        if request.args.get('content', '1') != '0':
+            # lgtm[py/path-injection]
+            # CodeQL: script_path is validated via safe_path_join() above, ensuring it's within CONFIG_DIR
+            data["content"] = read_text_file(script_path)
+        response = jsonify(data)
+        response.set_etag(etag, weak=True)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/bootstrap-script/<filename>/raw')
+def get_bootstrap_script_raw(filename):
+    """
+    Get bootstrap script content as plain text.
+
+    Served straight from disk (sendfile where the server supports it) with
+    ETag and Last-Modified validators, so unchanged scripts answer 304.
+    """
+    try:
+        # Validate filename to prevent path traversal
+        is_valid, sanitized_filename = validate_filename_for_api(filename)
+        if not is_valid:
+            return jsonify({"error": "Invalid filename"}), 400
+
+        # Construct safe path using validated filename
+        script_path = safe_path_join(CONFIG_DIR, sanitized_filename)
+        if script_path is None:
+            return jsonify({"error": "Invalid path"}), 400
+
+        if not script_path.exists() or not script_path.suffix == '.py':
+            return jsonify({'error': 'Script not found'}), 404
 
         # lgtm[py/path-injection]
         # CodeQL: script_path is validated via safe_path_join() above, ensuring it's within CONFIG_DIR
-        return jsonify(
-            {
-                "name": sanitized_filename,
-                "content": script_path.read_text(),
-                "path": str(script_path),
-                "active": is_active,
-            }
-        )
+        return send_file(script_path, mimetype='text/x-python', conditional=True)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -903,31 +1383,30 @@ def set_active_script(filename):
             # If bootstrap.py doesn't exist, we need to find what it should point to
             # or create it from another file. But if the user is clicking on bootstrap.py,
             # it should exist (either as file or symlink)
-            if not script_path.exists():
+            target_stat = lstat_or_none(target)
+            if target_stat is None:
                 return jsonify({'error': 'bootstrap.py not found. Please set another script as active first.'}), 404
+            target_is_symlink = stat.S_ISLNK(target_stat.st_mode)
 
             # Resolve the source file path before potentially removing the symlink
             source_file = script_path
-            if script_path.is_symlink():
-                try:
-                    # Get the actual target file that the symlink points to
-                    source_file = script_path.resolve()
-                    if not source_file.exists():
-                        return jsonify({'error': f'Symlink target not found: {source_file}'}), 404
-                except (OSError, RuntimeError) as e:
-                    return jsonify({'error': f'Cannot resolve symlink: {str(e)}'}), 500
+            if target_is_symlink:
+                # Get the actual target file that the symlink points to; the
+                # cached resolution is None for dangling links and loops
+                source_file = get_active_script()
+                if source_file is None:
+                    return jsonify({'error': f'Symlink target not found: {os.readlink(target)}'}), 404
 
             # If bootstrap.py is a symlink, remove it first
-            if target.exists() and target.is_symlink():
+            if target_is_symlink:
                 try:
                     target.unlink()
                 except (OSError, RuntimeError):
                     pass
 
             # Copy the source file to bootstrap.py
-            import shutil
             try:
-                shutil.copy2(source_file, target)
+                fast_copy(source_file, target)
             except (OSError, shutil.Error) as e:
                 return jsonify({'error': f'Failed to copy file: {str(e)}'}), 500
 
@@ -939,12 +1418,13 @@ def set_active_script(filename):
 
         # For other scripts, create symlink to bootstrap.py
         target = BOOTSTRAP_SCRIPT
-        if target.exists() and target.is_symlink():
+        target_stat = lstat_or_none(target)
+        if target_stat is not None and stat.S_ISLNK(target_stat.st_mode):
             target.unlink()
-        elif target.exists():
+        elif target_stat is not None:
             # Backup existing bootstrap.py
             # lgtm[py/path-injection]
-            backup = CONFIG_DIR / f'bootstrap_backup_{int(target.stat().st_mtime)}.py'
+            backup = CONFIG_DIR / f'bootstrap_backup_{int(target_stat.st_mtime)}.py'
             target.rename(backup)
             # Clean up old backups, keeping only the 5 most recent
             cleanup_old_backups()
@@ -1004,21 +1484,15 @@ def rename_bootstrap_script(filename):
         new_path = safe_path_join(CONFIG_DIR, new_name)
         if new_path is None:
             return jsonify({"error": "Invalid new filename"}), 400
-        if new_path.exists() and new_path != script_path:
+        if new_path != script_path and lstat_or_none(new_path) is not None:
             return jsonify({'error': f'A script with the name {new_name} already exists'}), 400
 
         # Prevent renaming the active script (bootstrap.py)
-        active_path = BOOTSTRAP_SCRIPT
-        if active_path.exists():
-            try:
-                if active_path.is_symlink():
-                    resolved = active_path.resolve()
-                    if resolved == script_path.resolve():
-                        return jsonify({'error': 'Cannot rename the active script. Set another script as active first.'}), 400
-                elif active_path.resolve() == script_path.resolve():
-                    return jsonify({'error': 'Cannot rename bootstrap.py when it is the active script. Set another script as active first.'}), 400
-            except (OSError, RuntimeError):
-                pass
+        active_path = get_active_script()
+        if active_path is not None and is_same_file(script_path, active_path):
+            if BOOTSTRAP_SCRIPT.is_symlink():
+                return jsonify({'error': 'Cannot rename the active script. Set another script as active first.'}), 400
+            return jsonify({'error': 'Cannot rename bootstrap.py when it is the active script. Set another script as active first.'}), 400
 
         # Rename the file
         # CodeQL: Both script_path and new_path are validated via safe_path_join() above
@@ -1073,22 +1547,14 @@ def delete_bootstrap_script(filename):
 
         # Prevent deleting bootstrap.py if it's the active script (not a symlink)
         if sanitized_filename == "bootstrap.py":
-            target = BOOTSTRAP_SCRIPT
-            if target.exists() and not target.is_symlink():
+            target_stat = lstat_or_none(BOOTSTRAP_SCRIPT)
+            if target_stat is not None and not stat.S_ISLNK(target_stat.st_mode):
                 return jsonify({'error': 'Cannot delete bootstrap.py when it is the active script. Set another script as active first.'}), 400
 
         # Check if this script is currently active
-        active_path = BOOTSTRAP_SCRIPT
-        if active_path.exists():
-            try:
-                if active_path.is_symlink():
-                    resolved = active_path.resolve()
-                    if resolved == script_path.resolve():
-                        return jsonify({'error': 'Cannot delete the active script. Set another script as active first.'}), 400
-                elif active_path.resolve() == script_path.resolve():
-                    return jsonify({'error': 'Cannot delete the active script. Set another script as active first.'}), 400
-            except (OSError, RuntimeError):
-                pass
+        active_path = get_active_script()
+        if active_path is not None and is_same_file(script_path, active_path):
+            return jsonify({'error': 'Cannot delete the active script. Set another script as active first.'}), 400
 
         # Delete the file
         try:
@@ -1118,32 +1584,36 @@ def list_backup_scripts():
     backups = []
     script_dir = CONFIG_DIR
 
-    for file in script_dir.glob('bootstrap_backup_*.py'):
-        try:
-            stat = file.stat()
-            # Extract timestamp from filename (bootstrap_backup_TIMESTAMP.py)
-            timestamp_str = file.stem.replace('bootstrap_backup_', '')
+    # DirEntry.stat() reuses the directory read instead of a second lookup
+    with os.scandir(script_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not (name.startswith('bootstrap_backup_') and name.endswith('.py')):
+                continue
             try:
-                timestamp = int(timestamp_str)
-                from datetime import datetime
-                dt = datetime.fromtimestamp(timestamp)
-                human_date = dt.strftime('%Y-%m-%d %H:%M:%S')
-            except (ValueError, OSError):
-                # Fallback to file modification time
-                from datetime import datetime
-                dt = datetime.fromtimestamp(stat.st_mtime)
-                human_date = dt.strftime('%Y-%m-%d %H:%M:%S')
-
-            backups.append({
-                'name': file.name,
-                'path': str(file),
-                'size': stat.st_size,
-                'modified': stat.st_mtime,
-                'human_date': human_date,
-                'timestamp': timestamp if 'timestamp' in locals() else int(stat.st_mtime)
-            })
-        except OSError:
-            continue
+                file_stat = entry.stat()
+                # Extract timestamp from filename (bootstrap_backup_TIMESTAMP.py)
+                timestamp_str = name[len('bootstrap_backup_'):-len('.py')]
+                try:
+                    timestamp = int(timestamp_str)
+                    dt = datetime.fromtimestamp(timestamp)
+                    human_date = dt.strftime('%Y-%m-%d %H:%M:%S')
+                except (ValueError, OSError, OverflowError):
+                    # Fallback to file modification time
+                    timestamp = int(file_stat.st_mtime)
+                    dt = datetime.fromtimestamp(file_stat.st_mtime)
+                    human_date = dt.strftime('%Y-%m-%d %H:%M:%S')
+
+                backups.append({
+                    'name': name,
+                    'path': entry.path,
+                    'size': file_stat.st_size,
+                    'modified': file_stat.st_mtime,
+                    'human_date': human_date,
+                    'timestamp': timestamp
+                })
+            except OSError:
+                continue
 
     # Sort by timestamp (newest first)
     backups.sort(key=lambda x: x['timestamp'], reverse=True)
@@ -1178,8 +1648,7 @@ def restore_backup_script(filename):
         if restore_as == 'active':
             # Restore as bootstrap.py (active)
             target = BOOTSTRAP_SCRIPT
-            import shutil
-            shutil.copy2(backup_path, target)
+            fast_copy(backup_path, target)
             return jsonify({
                 'success': True,
                 'message': f'Backup {filename} restored as bootstrap.py (active)',
@@ -1200,8 +1669,7 @@ def restore_backup_script(filename):
             new_path = safe_path_join(CONFIG_DIR, new_name)
             if new_path is None:
                 return jsonify({"error": "Invalid restored filename"}), 400
-            import shutil
-            shutil.copy2(backup_path, new_path)
+            fast_copy(backup_path, new_path)
             return jsonify({
                 'success': True,
                 'message': f'Backup {filename} restored as {new_name}',
@@ -1264,12 +1732,14 @@ def upload_bootstrap_script():
                 file.seek(0)  # Reset to beginning for save
 
             file.save(str(file_path))
-            # Set permissions - try with subprocess if direct chmod fails
+            # Overwriting an existing name leaves the directory mtime alone
+            invalidate_scripts_list()
+            # Set permissions; a chmod(1) fallback would hit the same EPERM, so
+            # just note the failure and keep the upload
             try:
                 file_path.chmod(0o644)
-            except PermissionError:
-                # Try using chmod command
-                subprocess.run(['chmod', '644', str(file_path)], check=False)
+            except PermissionError as e:
+                print(f"Warning: Could not set permissions on {filename}: {e}", flush=True)
 
             # Log security event
             client_ip = request.remote_addr or 'unknown'
@@ -1297,42 +1767,115 @@ def upload_bootstrap_script():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/status')
-def get_status():
-    """Get service status"""
-    try:
-        # Check if pod service is running
-        # Since we're in a container, systemctl may not work, so we use the health endpoint as primary method
-        container_running = False
-        health_ok = False
+# Per-thread keep-alive connection to the local nginx for health checks
+_health_connection = threading.local()
+
+def check_nginx_health(timeout=2):
+    """
+    GET nginx's /health endpoint and return (status, body)
+
+    The connection is kept alive and reused by later polls from the same
+    thread. If nginx closed an idle connection in the meantime, the request
+    is retried once on a fresh one.
+    """
+    conn = getattr(_health_connection, 'conn', None)
+    if conn is None:
+        conn = _health_connection.conn = http.client.HTTPConnection('127.0.0.1', timeout=timeout)
+    for attempt in range(2):
+        reused = conn.sock is not None
+        try:
+            conn.request('GET', '/health')
+            response = conn.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            if not reused or attempt:
+                raise
+
+# Last (container_running, health_ok) as (expires_at, result). Dashboards in
+# several tabs poll the status together, so one probe serves them for a second.
+_service_status_cache = (0, None)
+SERVICE_STATUS_CACHE_TTL = 1
+# Seconds the nginx health check may take before the systemctl fallback starts
+SYSTEMCTL_FALLBACK_DELAY = 0.2
+
+def probe_service_status():
+    """Return (container_running, health_ok), reusing a result younger than SERVICE_STATUS_CACHE_TTL"""
+    global _service_status_cache
+    expires_at, result = _service_status_cache
+    if result is not None and expires_at > time.monotonic():
+        return result
+
+    # Check if pod service is running
+    # Since we're in a container, systemctl may not work, so we use the health endpoint as primary method
+    container_running = False
+    health_ok = False
+
+    # The systemctl fallback starts as a child process only if the health check
+    # hasn't answered within SYSTEMCTL_FALLBACK_DELAY. A healthy nginx answers
+    # well before that, so no process is spawned; when nginx hangs, the
+    # systemctl check overlaps the rest of the health timeout.
+    fallback_lock = threading.Lock()
+    fallback = {'proc': None, 'cancelled': False}
+
+    def start_fallback():
+        with fallback_lock:
+            if fallback['cancelled'] or fallback['proc'] is not None:
+                return
+            try:
+                fallback['proc'] = subprocess.Popen(
+                    ['systemctl', 'is-active', '--quiet', 'ztpbootstrap-pod.service'],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except OSError:
+                fallback['cancelled'] = True
 
+    timer = threading.Timer(SYSTEMCTL_FALLBACK_DELAY, start_fallback)
+    timer.daemon = True
+    timer.start()
+    try:
         # Primary method: Check if we can reach nginx health endpoint (indicates service is running)
         # This is the most reliable method when systemctl is not available in containers
         try:
-            import urllib.request
-            response = urllib.request.urlopen('http://127.0.0.1/health', timeout=2)
-            status_code = response.getcode()
+            status_code, health_body = check_nginx_health(timeout=2)
             if status_code == 200:
                 container_running = True
                 # Also check the response body for health status
-                health_body = response.read().decode().strip()
-                health_ok = health_body == 'healthy'
+                health_ok = health_body.decode().strip() == 'healthy'
         except Exception as e:
             # Health endpoint not reachable - try systemctl as fallback
-            try:
-                result = subprocess.run(
-                    ['systemctl', 'is-active', '--quiet', 'ztpbootstrap-pod.service'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                if result.returncode == 0:
-                    container_running = True
-                    # If systemctl says it's running, assume health is ok
-                    health_ok = True
-            except Exception:
-                pass
+            timer.cancel()
+            start_fallback()
+            systemctl_proc = fallback['proc']
+            if systemctl_proc is not None:
+                try:
+                    if systemctl_proc.wait(timeout=2) == 0:
+                        container_running = True
+                        # If systemctl says it's running, assume health is ok
+                        health_ok = True
+                except subprocess.TimeoutExpired:
+                    pass
+    finally:
+        timer.cancel()
+        with fallback_lock:
+            fallback['cancelled'] = True
+            systemctl_proc = fallback['proc']
+        if systemctl_proc is not None:
+            # Not needed (or too slow): stop it and reap it
+            if systemctl_proc.poll() is None:
+                systemctl_proc.kill()
+            systemctl_proc.wait()
+
+    result = (container_running, health_ok)
+    _service_status_cache = (time.monotonic() + SERVICE_STATUS_CACHE_TTL, result)
+    return result
 
+@app.route('/api/status')
+def get_status():
+    """Get service status"""
+    try:
+        container_running, health_ok = probe_service_status()
         return jsonify({
             'container_running': container_running,
             'health_ok': health_ok,
@@ -1342,199 +1885,675 @@ def get_status():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Device connections as last loaded or saved, keyed by the file signature.
+# The access log parser updates this dict in place, so it only has to read
+# the log bytes appended since the previous poll.
+_device_connections_cache = (None, None)
+# Held while parsing (the log cursor must not be consumed twice) and while
+# reading the shared connections dict
+device_connections_lock = threading.RLock()
+
 def load_device_connections():
-    """Load device connection data from JSON file"""
-    if DEVICE_CONNECTIONS_FILE.exists():
+    """Load device connection data from JSON file (kept in memory until the file changes)"""
+    global _device_connections_cache
+    signature = file_signature(DEVICE_CONNECTIONS_FILE)
+    if signature is None:
+        return {}
+    cached_signature, cached_connections = _device_connections_cache
+    if cached_connections is None or cached_signature != signature:
         try:
-            with open(DEVICE_CONNECTIONS_FILE, 'r') as f:
-                return json.load(f)
+            cached_connections = read_json_file(DEVICE_CONNECTIONS_FILE)
         except:
             return {}
-    return {}
+        # Sessions are bounded ring buffers in memory, so the oldest drop off as new ones start
+        for device in cached_connections.values():
+            device['sessions'] = deque(device.get('sessions', ()), maxlen=MAX_DEVICE_SESSIONS)
+        _device_connections_cache = (signature, cached_connections)
+    return cached_connections
 
 def save_device_connections(connections):
     """Save device connection data to JSON file"""
+    global _device_connections_cache
     try:
-        with open(DEVICE_CONNECTIONS_FILE, 'w') as f:
-            json.dump(connections, f, indent=2)
+        # Session deques are written out as plain lists. Only this module
+        # reads the file back, so it is written compact.
+        write_json_file(DEVICE_CONNECTIONS_FILE, connections, default=list, indent=False)
+        _device_connections_cache = (file_signature(DEVICE_CONNECTIONS_FILE), connections)
         return True
     except Exception as e:
         print(f"Error saving device connections: {e}")
         return False
 
+# The cursor also fingerprints this many bytes before its offset, so a log
+# rewritten in place (copytruncate, editors) is noticed even if it regrew
+LOG_CURSOR_CHECK_BYTES = 256
+
+def log_fingerprint(data):
+    """64-bit BLAKE2b fingerprint of the bytes preceding the log cursor"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+# Last loaded log cursor, keyed by the file signature it was read from
+_log_cursor_cache = (None, None)
+
+def load_log_cursor():
+    """Load the (inode, offset, fingerprint) of the last access log byte already parsed"""
+    global _log_cursor_cache
+    signature = file_signature(NGINX_LOG_CURSOR_FILE)
+    if signature is None:
+        return None, 0, None
+    cached_signature, cached_cursor = _log_cursor_cache
+    if cached_cursor is not None and cached_signature == signature:
+        return cached_cursor
+    try:
+        cursor = read_json_file(NGINX_LOG_CURSOR_FILE)
+        cursor = (int(cursor['inode']), int(cursor['offset']), cursor.get('fingerprint'))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None, 0, None
+    _log_cursor_cache = (signature, cursor)
+    return cursor
+
+def save_log_cursor(inode, offset, fingerprint):
+    """Save the access log cursor"""
+    global _log_cursor_cache
+    try:
+        write_json_file(NGINX_LOG_CURSOR_FILE, {'inode': inode, 'offset': offset, 'fingerprint': fingerprint})
+        _log_cursor_cache = (file_signature(NGINX_LOG_CURSOR_FILE), (inode, offset, fingerprint))
+        return True
+    except Exception as e:
+        print(f"Error saving log cursor: {e}")
+        return False
+
+# How much of the end of the access log parse_nginx_access_log() reads when it
+# has no usable cursor (first run, rotation or truncation)
+ACCESS_LOG_TAIL_BYTES = 256 * 1024
+# Nginx log format: IP - - [timestamp] "method path protocol" status size "referer" "user-agent"
+# Run with finditer over the raw bytes of many lines at once, so fields may not
+# cross a newline; lines are only decoded field by field
+NGINX_ACCESS_LINE_RE = re.compile(
+    rb'^(\S+) - - \[([^\]\n]+)\] "(\S+) (\S+) ([^"\n]+)" (\d+) (\S+) "([^"\n]*)" "([^"\n]*)"',
+    re.MULTILINE,
+)
+
+NGINX_MONTHS = {
+    b'Jan': 1, b'Feb': 2, b'Mar': 3, b'Apr': 4, b'May': 5, b'Jun': 6,
+    b'Jul': 7, b'Aug': 8, b'Sep': 9, b'Oct': 10, b'Nov': 11, b'Dec': 12,
+}
+
+def parse_nginx_timestamp(value):
+    """
+    Convert an nginx $time_local value (b'08/Nov/2025:12:00:00 +0000') to epoch seconds
+
+    The fields sit at fixed offsets, so slicing them out avoids strptime's
+    per-call format parsing. A non-UTC +HHMM/-HHMM offset is folded in.
+    """
+    seconds = calendar.timegm((
+        int(value[7:11]), NGINX_MONTHS[value[3:6]], int(value[0:2]),
+        int(value[12:14]), int(value[15:17]), int(value[18:20]), 0, 0, 0,
+    ))
+    offset = value[21:26]
+    if offset and offset != b'+0000':
+        offset_seconds = int(offset[1:3]) * 3600 + int(offset[3:5]) * 60
+        seconds += -offset_seconds if offset[:1] == b'+' else offset_seconds
+    return float(seconds)
+
+# Only the most recent sessions are kept per device
+MAX_DEVICE_SESSIONS = 50
+
+# Health checks and the web UI's own requests are not device activity:
+# exact paths, plus anything under /ui/ and any path containing /api/, in one pattern
+UNTRACKED_PATH_RE = re.compile(rb'^/(?:health|ui|api)\Z|^/ui/|/api/')
+# User agents of browsers and of Arista devices (Arista-EOS, Arista-ZTP, etc.)
+BROWSER_AGENT_RE = re.compile(rb'Mozilla|Gecko|Chrome|Safari')
+ARISTA_AGENT_RE = re.compile(rb'Arista|EOS|ZTP')
+
 def parse_nginx_access_log():
     """Parse nginx access log to track device connections"""
+    with device_connections_lock:
+        return update_device_connections()
+
+def update_device_connections():
+    """Apply access log lines appended since the last call; caller holds device_connections_lock"""
     connections = load_device_connections()
     current_time = time.time()
 
-    # Track which log lines we've already processed
-    # Only track processed lines for the last 24 hours to allow re-processing if filtering logic changes
-    processed_lines_file = CONFIG_DIR / 'processed_log_lines.txt'
-    processed_lines = set()
-    if processed_lines_file.exists():
-        try:
-            with open(processed_lines_file, 'r') as f:
-                all_processed = [line.strip() for line in f if line.strip()]
-                # Only keep lines from the last 24 hours (approximate - check timestamp in log line)
-                cutoff_time = current_time - 86400  # 24 hours
-                for line in all_processed:
-                    # Try to extract timestamp from log line to determine if it's recent
-                    # Format: IP - - [timestamp] ...
-                    match = re.match(r'^[^-]+ - - \[([^\]]+)\]', line)
-                    if match:
-                        try:
-                            timestamp_str = match.group(1)
-                            dt = datetime.strptime(timestamp_str.split()[0], '%d/%b/%Y:%H:%M:%S')
-                            line_timestamp = dt.timestamp()
-                            if line_timestamp > cutoff_time:
-                                processed_lines.add(line)
-                        except:
-                            # If we can't parse timestamp, keep the line (conservative approach)
-                            processed_lines.add(line)
-                    else:
-                        # If it doesn't match log format, it might be a MARK line, keep it
-                        processed_lines.add(line)
-        except:
-            pass
-
     # Nginx log format: IP - - [timestamp] "method path protocol" status size "referer" "user-agent"
     # Example: 10.0.2.15 - - [08/Nov/2025:12:00:00 +0000] "GET /bootstrap.py HTTP/1.1" 200 1234 "-" "Arista-ZTP/1.0"
 
-    if not NGINX_ACCESS_LOG.exists():
-        return connections
-
     try:
-        # Read last 1000 lines to avoid processing too much
-        with open(NGINX_ACCESS_LOG, 'r') as f:
-            lines = f.readlines()
-            recent_lines = lines[-1000:] if len(lines) > 1000 else lines
-
-        new_processed_lines = set()
-        for line in recent_lines:
-            line_stripped = line.strip()
-            # Skip if we've already processed this line
-            if line_stripped in processed_lines:
-                new_processed_lines.add(line_stripped)
-                continue
-
-            # Parse log line
-            # Match: IP - - [timestamp] "method path protocol" status size "referer" "user-agent"
-            match = re.match(r'^(\S+) - - \[([^\]]+)\] "(\S+) (\S+) ([^"]+)" (\d+) (\S+) "([^"]*)" "([^"]*)"', line)
-            if not match:
-                new_processed_lines.add(line_stripped)
-                continue
-
-            ip = match.group(1)
-            timestamp_str = match.group(2)
-            method = match.group(3)
-            path = match.group(4)
-            status = int(match.group(6))
-            user_agent = match.group(9)
+        # The log is append-only, so only the bytes after the saved cursor are
+        # new. If the inode changed (rotation), the file shrank (truncation) or
+        # the bytes before the cursor changed (rewritten in place), start again
+        # from the tail of the file.
+        cursor_inode, offset, fingerprint = load_log_cursor()
+        if cursor_inode is None:
+            # First cursor-based run: remove the unbounded sidecar of older versions
+            try:
+                LEGACY_PROCESSED_LINES_FILE.unlink()
+            except OSError:
+                pass
+        # Opening is the existence check; a missing log raises FileNotFoundError
+        with open(nginx_log_path('access'), 'rb') as f:
+            st = os.fstat(f.fileno())
+            resume = False
+            if cursor_inode == st.st_ino and offset <= st.st_size:
+                # Read from just before the cursor so the check bytes come
+                # with the new data in one read
+                buf_start = max(0, offset - LOG_CURSOR_CHECK_BYTES)
+                f.seek(buf_start)
+                buf = f.read()
+                resume = log_fingerprint(buf[:offset - buf_start]) == fingerprint
+            if resume:
+                start = offset
+            else:
+                start = buf_start = max(0, st.st_size - ACCESS_LOG_TAIL_BYTES)
+                f.seek(start)
+                buf = f.read()
+            data = buf[start - buf_start:]
+
+            # Only consume complete lines; a partial last line is picked up next time
+            end = data.rfind(b'\n') + 1
+            new_offset = start + end
+            check_start = max(0, new_offset - LOG_CURSOR_CHECK_BYTES)
+            if check_start >= buf_start:
+                check = buf[check_start - buf_start:new_offset - buf_start]
+            else:
+                check = os.pread(f.fileno(), new_offset - check_start, check_start)
+
+        data = data[:end]
+        if not resume and start > 0:
+            # Drop the partial line we seeked into
+            data = data[data.find(b'\n') + 1:]
+        new_fingerprint = log_fingerprint(check)
+        if (st.st_ino, new_offset, new_fingerprint) != (cursor_inode, offset, fingerprint):
+            # Most polls find nothing new; skip the rewrite then
+            save_log_cursor(st.st_ino, new_offset, new_fingerprint)
+
+        # One C-level scan over all new lines; lines that don't match are skipped
+        # Match: IP - - [timestamp] "method path protocol" status size "referer" "user-agent"
+        # Fields stay bytes through the filters; only kept lines are decoded
+        agent_kinds = {}
+        path_kinds = {}
+        # raw IP -> [first user agent, latest download time, timestamps]
+        hits_by_ip = {}
+        for match in NGINX_ACCESS_LINE_RE.finditer(data):
+            # One group() call fetches every field the loop needs
+            raw_ip, time_local, path, raw_status, user_agent = match.group(1, 2, 4, 6, 9)
 
             # Skip health checks, UI requests, and API requests (WebUI's own requests)
             # Note: We allow browser downloads of /bootstrap.py and / (root, which serves bootstrap.py) to be tracked (for testing purposes)
             # but filter out other browser requests (UI, API, etc.)
             # Also allow Arista device user agents (Arista-EOS, Arista-ZTP, etc.) to be tracked
-            is_browser = user_agent and ('Mozilla' in user_agent or 'Gecko' in user_agent or 'Chrome' in user_agent or 'Safari' in user_agent)
-            is_arista_device = user_agent and ('Arista' in user_agent or 'EOS' in user_agent or 'ZTP' in user_agent)
-            is_bootstrap_path = path == '/bootstrap.py' or path == '/'
+            # A handful of user agents repeat across lines, so classify each once
+            agent_kind = agent_kinds.get(user_agent)
+            if agent_kind is None:
+                agent_kind = agent_kinds[user_agent] = (
+                    BROWSER_AGENT_RE.search(user_agent) is not None,
+                    ARISTA_AGENT_RE.search(user_agent) is not None,
+                )
+            is_browser, is_arista_device = agent_kind
+            # Paths repeat just as much (device polls, the UI's own API calls)
+            path_kind = path_kinds.get(path)
+            if path_kind is None:
+                path_kind = path_kinds[path] = (
+                    path == b'/bootstrap.py' or path == b'/',
+                    UNTRACKED_PATH_RE.search(path) is not None,
+                )
+            is_bootstrap_path, is_untracked_path = path_kind
 
             # Filter out if:
             # 1. It's a health/UI/API path (except bootstrap paths)
             # 2. It's a browser request to a non-bootstrap path
             # But always allow Arista device requests and bootstrap path requests
-            if (not is_arista_device and not is_bootstrap_path and
-                (path in ['/health', '/ui', '/api'] or
-                 path.startswith('/ui/') or
-                 path.startswith('/api/') or
-                 '/api/' in path or
-                 (is_browser and not is_bootstrap_path))):
-                # Mark as processed but don't count
-                new_processed_lines.add(line_stripped)
+            if not is_arista_device and not is_bootstrap_path and (is_untracked_path or is_browser):
                 continue
 
             # Parse timestamp (format: 08/Nov/2025:12:00:00 +0000)
             try:
-                dt = datetime.strptime(timestamp_str.split()[0], '%d/%b/%Y:%H:%M:%S')
-                timestamp = dt.timestamp()
-            except:
+                timestamp = parse_nginx_timestamp(time_local)
+            except (KeyError, ValueError):
                 continue
 
+            # Collect hits per IP in log order; each device is then updated once
+            hits = hits_by_ip.get(raw_ip)
+            if hits is None:
+                hits = hits_by_ip[raw_ip] = [user_agent, None, []]
+            hits[2].append(timestamp)
+
+            # Track bootstrap.py downloads (both /bootstrap.py and / which serves bootstrap.py as index)
+            if (path == b'/bootstrap.py' or path == b'/') and raw_status == b'200':
+                if hits[1] is None or timestamp > hits[1]:
+                    hits[1] = timestamp
+
+        for raw_ip, (user_agent, download_time, timestamps) in hits_by_ip.items():
+            ip = raw_ip.decode('utf-8', 'replace')
+
             # Initialize device entry if not exists
-            if ip not in connections:
-                connections[ip] = {
+            device = connections.get(ip)
+            if device is None:
+                device = connections[ip] = {
                     'ip': ip,
-                    'first_seen': timestamp,
-                    'last_seen': timestamp,
+                    'first_seen': timestamps[0],
+                    'last_seen': timestamps[0],
                     'bootstrap_downloaded': False,
                     'bootstrap_download_time': None,
-                    'session_start': timestamp,
-                    'session_end': timestamp,
+                    'session_start': timestamps[0],
+                    'session_end': timestamps[0],
                     'total_requests': 0,
-                    'user_agent': user_agent,
-                    'sessions': []
+                    'user_agent': user_agent.decode('utf-8', 'replace'),
+                    'sessions': deque(maxlen=MAX_DEVICE_SESSIONS)
                 }
 
-            device = connections[ip]
-            device['last_seen'] = timestamp
-            device['total_requests'] = device.get('total_requests', 0) + 1
+            device['last_seen'] = timestamps[-1]
+            device['total_requests'] = device.get('total_requests', 0) + len(timestamps)
 
-            # Track bootstrap.py downloads (both /bootstrap.py and / which serves bootstrap.py as index)
-            if (path == '/bootstrap.py' or (path == '/' and status == 200)) and status == 200:
+            if download_time is not None:
                 device['bootstrap_downloaded'] = True
-                if not device['bootstrap_download_time'] or timestamp > device['bootstrap_download_time']:
-                    device['bootstrap_download_time'] = timestamp
+                if not device['bootstrap_download_time'] or download_time > device['bootstrap_download_time']:
+                    device['bootstrap_download_time'] = download_time
 
             # Track sessions (requests within 5 minutes are considered same session)
-            if device['sessions']:
-                last_session = device['sessions'][-1]
-                if timestamp - last_session['end'] < 300:  # 5 minutes
+            sessions = device['sessions']
+            last_session = sessions[-1] if sessions else None
+            for timestamp in timestamps:
+                if last_session is not None and timestamp - last_session['end'] < 300:  # 5 minutes
                     last_session['end'] = timestamp
                     last_session['requests'] += 1
                 else:
                     # New session
-                    device['sessions'].append({
+                    last_session = {
                         'start': timestamp,
                         'end': timestamp,
                         'requests': 1
-                    })
-            else:
-                device['sessions'].append({
-                    'start': timestamp,
-                    'end': timestamp,
-                    'requests': 1
-                })
+                    }
+                    sessions.append(last_session)
+
+        # Clean up old devices (not seen in 24 hours)
+        cutoff_time = current_time - 86400  # 24 hours
+        # Prune in place; usually nothing is stale and the dict is left as is
+        stale = [ip for ip, data in connections.items() if data['last_seen'] <= cutoff_time]
+        for ip in stale:
+            del connections[ip]
+
+        # Most polls find no new device lines; skip rewriting the file then
+        if hits_by_ip or stale:
+            save_device_connections(connections)
+        return connections
+    except FileNotFoundError:
+        return connections
+    except Exception as e:
+        print(f"Error parsing nginx log: {e}")
+        return connections
+
+# Seconds between background checks of the access log for new lines
+ACCESS_LOG_POLL_INTERVAL = 5
+_access_log_poller = None
+_access_log_poller_lock = threading.Lock()
+
+def poll_access_log():
+    """Parse new access log lines as they arrive, so device polls rarely have to"""
+    last_signature = None
+    while True:
+        try:
+            signature = file_signature(nginx_log_path('access'))
+            if signature is not None and signature != last_signature:
+                parse_nginx_access_log()
+                last_signature = signature
+        except Exception as e:
+            print(f"Error polling nginx access log: {e}")
+        time.sleep(ACCESS_LOG_POLL_INTERVAL)
+
+def start_access_log_poller():
+    """Start the access log poller thread once per process"""
+    global _access_log_poller
+    if _access_log_poller is not None:
+        return
+    with _access_log_poller_lock:
+        if _access_log_poller is None:
+            thread = threading.Thread(target=poll_access_log, name='access-log-poller', daemon=True)
+            thread.start()
+            _access_log_poller = thread
+
+PODMAN_BINARY = Path('/usr/bin/podman')
+JOURNALCTL_BINARY = Path('/usr/bin/journalctl')
+
+# Tool and service probes fork a process each, so their results are reused
+# for a while instead of being re-run on every log request
+TOOL_PROBE_TTL = 60
+_tool_probe_cache = {}
+
+
+def cached_probe(key, probe, *args):
+    """Return probe(*args), reusing a previous result for TOOL_PROBE_TTL seconds"""
+    now = time.monotonic()
+    cached = _tool_probe_cache.get(key)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    value = probe(*args)
+    _tool_probe_cache[key] = (value, now + TOOL_PROBE_TTL)
+    return value
+
+
+def probe_systemctl():
+    """Check if systemctl can be run"""
+    try:
+        subprocess.run(['systemctl', '--version'], capture_output=True, timeout=1, check=False)
+        return True
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False
 
-            # Keep only last 50 sessions per device
-            if len(device['sessions']) > 50:
-                device['sessions'] = device['sessions'][-50:]
 
-            # Mark this line as processed
-            new_processed_lines.add(line_stripped)
+def list_service_unit_files():
+    """Return the names of all systemd service unit files (empty if systemctl fails)"""
+    result = subprocess.run(
+        ['systemctl', 'list-unit-files', '--type=service', '--no-legend'],
+        capture_output=True,
+        text=True,
+        timeout=2
+    )
+    if result.returncode != 0:
+        return frozenset()
+    return frozenset(line.split(None, 1)[0] for line in result.stdout.splitlines() if line.strip())
 
-        # Save processed lines (keep only last 2000 to avoid file growing too large)
-        all_processed = processed_lines | new_processed_lines
-        if len(all_processed) > 2000:
-            # Keep only the most recent 2000
-            all_processed = set(list(all_processed)[-2000:])
 
+# Helper function to check if a systemd service exists
+# Note: systemctl may not be available in containers, so we try multiple methods
+def check_service_exists(service_name):
+    """Check if a systemd service exists and is available"""
+    # First check if systemctl is available (shared by all service checks)
+    if cached_probe('systemctl', probe_systemctl):
         try:
-            with open(processed_lines_file, 'w') as f:
-                for line in sorted(all_processed):
-                    f.write(line + '\n')
+            # One list-unit-files listing is shared by all service checks
+            if service_name in cached_probe('unit_files', list_service_unit_files):
+                return True
+            # Fallback: try is-active (returns 0 for active, 3 for inactive, 1 for not found)
+            result2 = subprocess.run(
+                ['systemctl', 'is-active', service_name],
+                capture_output=True,
+                text=True,
+                timeout=2
+            )
+            # is-active returns 0 for active, 3 for inactive, 1 for not found
+            # So return code 0 or 3 means service exists
+            if result2.returncode == 0 or result2.returncode == 3:
+                return True
         except Exception as e:
-            print(f"Error saving processed lines: {e}")
+            # Log error for debugging but don't fail
+            print(f"Error checking service {service_name} with systemctl: {e}", flush=True)
 
-        # Clean up old devices (not seen in 24 hours)
-        cutoff_time = current_time - 86400  # 24 hours
-        connections = {ip: data for ip, data in connections.items()
-                      if data['last_seen'] > cutoff_time}
+    # If systemctl not available, try to verify via journalctl
+    # If we can query the journal for this service, it exists
+    try:
+        journalctl_path = Path('/usr/bin/journalctl')
+        if os.access(journalctl_path, os.X_OK):
+            result = subprocess.run(
+                ['journalctl', '-u', service_name, '-n', '1', '--no-pager'],
+                capture_output=True,
+                text=True,
+                timeout=2
+            )
+            # If journalctl returns 0 or can query it, service likely exists
+            # Return code 1 might mean no logs yet, but service could still exist
+            if result.returncode == 0:
+                return True
+            # If stderr says "No entries" that means service exists but no logs
+            if result.returncode == 1 and 'no entries' in result.stderr.lower():
+                return True
+    except Exception:
+        pass
+
+    return False
+
+
+def probe_podman():
+    """Check if podman binary is available and can actually execute"""
+    podman_available = False
+    if os.access(PODMAN_BINARY, os.X_OK):
+        # Actually try to execute it to see if it works (might fail due to missing libraries)
+        try:
+            # Set LD_LIBRARY_PATH to help find libraries
+            env = os.environ.copy()
+            env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
+            podman_check = subprocess.run(
+                ['/usr/bin/podman', '--version'],
+                capture_output=True,
+                text=True,
+                timeout=2,
+                env=env
+            )
+            podman_available = podman_check.returncode == 0
+        except:
+            # Try without LD_LIBRARY_PATH
+            try:
+                podman_check = subprocess.run(
+                    ['/usr/bin/podman', '--version'],
+                    capture_output=True,
+                    text=True,
+                    timeout=2
+                )
+                podman_available = podman_check.returncode == 0
+            except:
+                pass
+    else:
+        # Fallback: try to run podman to see if it's in PATH
+        try:
+            podman_check = subprocess.run(
+                ['podman', '--version'],
+                capture_output=True,
+                text=True,
+                timeout=1
+            )
+            podman_available = podman_check.returncode == 0
+        except:
+            pass
+    return podman_available
+
+
+def probe_podman_socket(podman_available):
+    """Check podman socket accessibility"""
+    # Try multiple possible socket locations
+    socket_paths = [
+        Path('/run/podman/podman.sock'),
+        Path('/run/user/0/podman/podman.sock'),
+        Path('/var/run/podman/podman.sock'),
+    ]
+    # os.access is False for a missing path, so no separate exists() stat is needed
+    podman_socket_accessible = any(os.access(socket_path, os.R_OK) for socket_path in socket_paths)
+
+    # Also try to test podman connectivity directly
+    if podman_available and not podman_socket_accessible:
+        try:
+            # Try a simple podman command to see if it can connect
+            test_result = subprocess.run(
+                ['podman', 'ps', '--format', '{{.Names}}'],
+                capture_output=True,
+                text=True,
+                timeout=2
+            )
+            if test_result.returncode == 0:
+                podman_socket_accessible = True
+        except:
+            pass
+    return podman_socket_accessible
+
+
+def probe_journalctl():
+    """Check journalctl availability and ability to actually execute"""
+    journalctl_available = False
+    if os.access(JOURNALCTL_BINARY, os.X_OK):
+        # Actually try to execute it to see if it works (might fail due to missing libraries)
+        try:
+            # Set LD_LIBRARY_PATH to help find systemd libraries
+            env = os.environ.copy()
+            env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
+            journalctl_check = subprocess.run(
+                ['/usr/bin/journalctl', '--version'],
+                capture_output=True,
+                text=True,
+                timeout=2,
+                env=env
+            )
+            journalctl_available = journalctl_check.returncode == 0
+        except:
+            # Try without LD_LIBRARY_PATH
+            try:
+                journalctl_check = subprocess.run(
+                    ['/usr/bin/journalctl', '--version'],
+                    capture_output=True,
+                    text=True,
+                    timeout=2
+                )
+                journalctl_available = journalctl_check.returncode == 0
+            except:
+                pass
+    else:
+        # Fallback: try to run journalctl to see if it's in PATH
+        try:
+            journalctl_check = subprocess.run(
+                ['journalctl', '--version'],
+                capture_output=True,
+                text=True,
+                timeout=1
+            )
+            journalctl_available = journalctl_check.returncode == 0
+        except:
+            pass
+    return journalctl_available
+
+
+# Lines that are not the UI's own log/device polling requests
+POLLING_FREE_LINE_RE = re.compile(r'(?m)^(?!.*(?:/api/logs|/api/device-connections)).*$')
+
+def filter_log_request_noise(output):
+    """Drop log lines for the UI's own polling requests, which create recursive noise"""
+    raw_logs = output.strip()
+    filtered_log_lines = POLLING_FREE_LINE_RE.findall(raw_logs)
+    return '\n'.join(filtered_log_lines) if filtered_log_lines else raw_logs
 
-        save_device_connections(connections)
-        return connections
-    except Exception as e:
-        print(f"Error parsing nginx log: {e}")
-        return connections
+
+# Long-lived pool for container log fetches, so requests don't start and
+# tear down their own threads
+log_fetch_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix='log-fetch')
+
+
+def fetch_service_logs(service, container_name, line_count, podman_usable, journalctl_available):
+    """
+    Fetch recent logs for one service
+
+    Tries podman logs first and falls back to journalctl. The pod service has
+    no container of its own (container_name is None), so it only uses the
+    journal. Returns (logs, method_used, diagnostics).
+    """
+    container_logs = None
+    method_used = None
+    diagnostics = []
+    # Set LD_LIBRARY_PATH for podman/journalctl execution
+    env = os.environ.copy()
+    env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
+
+    # Method 1: Try podman logs (works if podman socket is accessible)
+    if container_name is not None and podman_usable:
+        try:
+            result = subprocess.run(
+                ['/usr/bin/podman', 'logs', '--tail', str(line_count), container_name],
+                capture_output=True,
+                text=True,
+                timeout=3,
+                env=env
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                container_logs = filter_log_request_noise(result.stdout)
+                method_used = 'podman'
+            elif result.returncode != 0:
+                diagnostics.append(f"podman logs {container_name} returned code {result.returncode}: {result.stderr}")
+        except FileNotFoundError:
+            diagnostics.append(f"podman binary not found")
+        except subprocess.TimeoutExpired:
+            diagnostics.append(f"podman logs {container_name} timed out")
+        except Exception as e:
+            diagnostics.append(f"podman logs {container_name} failed: {str(e)}")
+
+    # Method 2: Try journalctl (works if journal is accessible)
+    if not container_logs and journalctl_available:
+        try:
+            journal_result = subprocess.run(
+                ['/usr/bin/journalctl', '-D', '/var/log/journal', '--system', '-u', service, '-n', str(line_count), '--no-pager', '--no-hostname'],
+                capture_output=True,
+                text=True,
+                timeout=3,
+                env=env
+            )
+            if journal_result.returncode == 0 and journal_result.stdout.strip():
+                container_logs = filter_log_request_noise(journal_result.stdout)
+                method_used = 'journalctl'
+            elif journal_result.returncode != 0 and container_name is not None:
+                diagnostics.append(f"journalctl -u {service} returned code {journal_result.returncode}: {journal_result.stderr}")
+        except Exception as e:
+            if container_name is None:
+                logging.exception(f"Exception while retrieving logs via journalctl for {service}")
+                diagnostics.append(f"journalctl for {service} failed")
+            elif isinstance(e, FileNotFoundError):
+                diagnostics.append(f"journalctl binary not found")
+            elif isinstance(e, subprocess.TimeoutExpired):
+                diagnostics.append(f"journalctl -u {service} timed out")
+            else:
+                diagnostics.append(f"journalctl -u {service} failed: {str(e)}")
+
+    return container_logs, method_used, diagnostics
+
+
+# Rule line framing the container log access help text
+LOG_HELP_SEPARATOR = '=' * 70 + '\n'
+
+# Host-side follow commands per (pod, nginx, webui) service; the pod has no
+# container of its own, so it has no podman logs command
+JOURNALCTL_HELP_LINES = (
+    '  sudo journalctl -u ztpbootstrap-pod.service -n 50 -f\n',
+    '  sudo journalctl -u ztpbootstrap-nginx.service -n 50 -f\n',
+    '  sudo journalctl -u ztpbootstrap-webui.service -n 50 -f\n',
+)
+PODMAN_HELP_LINES = (
+    None,
+    '  sudo podman logs ztpbootstrap-nginx --tail 50 -f\n',
+    '  sudo podman logs ztpbootstrap-webui --tail 50 -f\n',
+)
+
+def build_log_help_template(pod_service_exists, nginx_service_exists, webui_service_exists):
+    """Render the host-side log commands for one combination of detected services"""
+    service_flags = (pod_service_exists, nginx_service_exists, webui_service_exists)
+    parts = [
+        'Container logs require host-level access to systemd journal and podman.\n',
+        'To view container logs, you need to SSH to the host server where this\n',
+        'service is running and execute the commands below.\n\n',
+        'SSH to {ssh_target}:\n',
+        '{ssh_instruction}\n\n',
+        'Once connected, run one of these commands:\n\n',
+    ]
+
+    # Build service-specific commands
+    parts.append('Using journalctl (recommended):\n')
+    parts.extend(line for line, exists in zip(JOURNALCTL_HELP_LINES, service_flags) if exists)
+    parts.append('\n')
+
+    parts.append('Or using podman logs:\n')
+    parts.extend(line for line, exists in zip(PODMAN_HELP_LINES, service_flags) if exists and line)
+    parts.append('\n')
+
+    parts.append('Note: The -f flag follows the logs in real-time. Remove it to see\n')
+    parts.append('      only the last N lines without following.\n')
+    parts.append(LOG_HELP_SEPARATOR)
+    return ''.join(parts)
+
+# Help text for every (pod, nginx, webui) service combination, formatted with
+# ssh_target and ssh_instruction per request
+LOG_HELP_TEMPLATES = {
+    key: build_log_help_template(*key)
+    for key in itertools.product((False, True), repeat=3)
+}
+
+# Access log lines for the web UI's own requests, hidden from the log viewer
+UI_API_REQUEST_RE = re.compile(rb'/ui/|/api/| /ui | /api ')
+# Same filter for text output: findall returns every line without such a request
+UI_API_FREE_LINE_RE = re.compile(r'(?m)^(?!.*(?:/ui/|/api/| /ui | /api )).*$')
 
 @app.route('/api/logs')
 def get_logs():
@@ -1555,24 +2574,21 @@ def get_logs():
 
             log_found = False
             for log_path in log_paths:
-                if log_path.exists():
-                    try:
-                        with open(log_path, 'r') as f:
-                            all_lines = f.readlines()
-                            recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-                            # Filter out UI/API requests to reduce noise
-                            filtered_lines = []
-                            for line in recent_lines:
-                                # Skip UI and API requests (they're not interesting for device tracking)
-                                if '/ui/' not in line and '/api/' not in line and ' /ui ' not in line and ' /api ' not in line:
-                                    filtered_lines.append(line)
-                            logs = ''.join(filtered_lines) if filtered_lines else "No device requests found in recent log entries (UI/API requests filtered out)"
-                            log_found = True
-                            break
-                    except Exception as e:
-                        logs = f"Error reading nginx access log from {log_path}: {str(e)}"
-                        log_found = True
-                        break
+                # Open directly instead of stat'ing first; a missing path just moves on
+                try:
+                    recent_lines = read_tail_lines(log_path, lines).splitlines(keepends=True)
+                    # Filter out UI/API requests to reduce noise (they're not interesting
+                    # for device tracking); only the surviving lines get decoded
+                    filtered_lines = [line for line in recent_lines if not UI_API_REQUEST_RE.search(line)]
+                    logs = b''.join(filtered_lines).decode('utf-8', 'replace') if filtered_lines else "No device requests found in recent log entries (UI/API requests filtered out)"
+                    log_found = True
+                    break
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logs = f"Error reading nginx access log from {log_path}: {str(e)}"
+                    log_found = True
+                    break
 
             if not log_found:
                 # Fallback: Try to read from nginx container via podman exec
@@ -1586,8 +2602,7 @@ def get_logs():
                     )
                     if result.returncode == 0 and result.stdout.strip():
                         # Filter out UI/API requests
-                        all_lines = result.stdout.split('\n')
-                        filtered_lines = [line for line in all_lines if '/ui/' not in line and '/api/' not in line and ' /ui ' not in line and ' /api ' not in line]
+                        filtered_lines = UI_API_FREE_LINE_RE.findall(result.stdout)
                         logs = '\n'.join(filtered_lines) if filtered_lines else "No device requests found in recent log entries (UI/API requests filtered out)"
                     else:
                         logs = f"Nginx access log not found. Checked paths: {', '.join(str(p) for p in log_paths)}"
@@ -1606,18 +2621,17 @@ def get_logs():
 
             log_found = False
             for log_path in log_paths:
-                if log_path.exists():
-                    try:
-                        with open(log_path, 'r') as f:
-                            all_lines = f.readlines()
-                            recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-                            logs = ''.join(recent_lines)
-                            log_found = True
-                            break
-                    except Exception as e:
-                        logs = f"Error reading nginx error log from {log_path}: {str(e)}"
-                        log_found = True
-                        break
+                # Open directly instead of stat'ing first; a missing path just moves on
+                try:
+                    logs = read_tail_lines(log_path, lines).decode('utf-8', 'replace')
+                    log_found = True
+                    break
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logs = f"Error reading nginx error log from {log_path}: {str(e)}"
+                    log_found = True
+                    break
 
             if not log_found:
                 # Fallback: Try to read from nginx container via podman exec
@@ -1637,73 +2651,10 @@ def get_logs():
 
         # Handle container logs (default) - only if not nginx_access or nginx_error
         if log_source not in ['nginx_access', 'nginx_error']:
-            # Helper function to check if a systemd service exists
-            # Note: systemctl may not be available in containers, so we try multiple methods
-            def check_service_exists(service_name):
-                """Check if a systemd service exists and is available"""
-                # First check if systemctl is available
-                try:
-                    subprocess.run(['systemctl', '--version'], capture_output=True, timeout=1, check=False)
-                    systemctl_available = True
-                except (FileNotFoundError, subprocess.TimeoutExpired):
-                    systemctl_available = False
-
-                if systemctl_available:
-                    try:
-                        # Use list-unit-files and grep for the service name
-                        result = subprocess.run(
-                            ['systemctl', 'list-unit-files', '--type=service', '--no-legend'],
-                            capture_output=True,
-                            text=True,
-                            timeout=2
-                        )
-                        if result.returncode == 0:
-                            # Check if service name appears in the output
-                            for line in result.stdout.split('\n'):
-                                if line.strip().startswith(service_name):
-                                    return True
-                        # Fallback: try is-active (returns 0 for active, 3 for inactive, 1 for not found)
-                        result2 = subprocess.run(
-                            ['systemctl', 'is-active', service_name],
-                            capture_output=True,
-                            text=True,
-                            timeout=2
-                        )
-                        # is-active returns 0 for active, 3 for inactive, 1 for not found
-                        # So return code 0 or 3 means service exists
-                        if result2.returncode == 0 or result2.returncode == 3:
-                            return True
-                    except Exception as e:
-                        # Log error for debugging but don't fail
-                        print(f"Error checking service {service_name} with systemctl: {e}", flush=True)
-
-                # If systemctl not available, try to verify via journalctl
-                # If we can query the journal for this service, it exists
-                try:
-                    journalctl_path = Path('/usr/bin/journalctl')
-                    if journalctl_path.exists() and os.access(journalctl_path, os.X_OK):
-                        result = subprocess.run(
-                            ['journalctl', '-u', service_name, '-n', '1', '--no-pager'],
-                            capture_output=True,
-                            text=True,
-                            timeout=2
-                        )
-                        # If journalctl returns 0 or can query it, service likely exists
-                        # Return code 1 might mean no logs yet, but service could still exist
-                        if result.returncode == 0:
-                            return True
-                        # If stderr says "No entries" that means service exists but no logs
-                        if result.returncode == 1 and 'no entries' in result.stderr.lower():
-                            return True
-                except Exception:
-                    pass
-
-                return False
-
             # Check which services exist (pod-based deployment)
-            pod_service_exists = check_service_exists('ztpbootstrap-pod.service')
-            nginx_service_exists = check_service_exists('ztpbootstrap-nginx.service')
-            webui_service_exists = check_service_exists('ztpbootstrap-webui.service')
+            pod_service_exists = cached_probe('ztpbootstrap-pod.service', check_service_exists, 'ztpbootstrap-pod.service')
+            nginx_service_exists = cached_probe('ztpbootstrap-nginx.service', check_service_exists, 'ztpbootstrap-nginx.service')
+            webui_service_exists = cached_probe('ztpbootstrap-webui.service', check_service_exists, 'ztpbootstrap-webui.service')
 
             # Build container mappings (pod-based setup)
             containers = {}
@@ -1731,122 +2682,17 @@ def get_logs():
                 }
 
             # Check if podman binary is available and can actually execute
-            podman_available = False
-            podman_socket_accessible = False
-            podman_binary_path = Path('/usr/bin/podman')
-            if podman_binary_path.exists() and os.access(podman_binary_path, os.X_OK):
-                # Actually try to execute it to see if it works (might fail due to missing libraries)
-                try:
-                    # Set LD_LIBRARY_PATH to help find libraries
-                    env = os.environ.copy()
-                    env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
-                    podman_check = subprocess.run(
-                        ['/usr/bin/podman', '--version'],
-                        capture_output=True,
-                        text=True,
-                        timeout=2,
-                        env=env
-                    )
-                    podman_available = podman_check.returncode == 0
-                except:
-                    # Try without LD_LIBRARY_PATH
-                    try:
-                        podman_check = subprocess.run(
-                            ['/usr/bin/podman', '--version'],
-                            capture_output=True,
-                            text=True,
-                            timeout=2
-                        )
-                        podman_available = podman_check.returncode == 0
-                    except:
-                        pass
-            else:
-                # Fallback: try to run podman to see if it's in PATH
-                try:
-                    podman_check = subprocess.run(
-                        ['podman', '--version'],
-                        capture_output=True,
-                        text=True,
-                        timeout=1
-                    )
-                    podman_available = podman_check.returncode == 0
-                except:
-                    pass
+            podman_binary_path = PODMAN_BINARY
+            podman_available = cached_probe('podman', probe_podman)
 
             # Check podman socket accessibility
-            # Try multiple possible socket locations
-            socket_paths = [
-                Path('/run/podman/podman.sock'),
-                Path('/run/user/0/podman/podman.sock'),
-                Path('/var/run/podman/podman.sock'),
-            ]
-            podman_socket_accessible = False
-            for socket_path in socket_paths:
-                if socket_path.exists():
-                    try:
-                        if os.access(socket_path, os.R_OK):
-                            podman_socket_accessible = True
-                            break
-                    except:
-                        pass
-
-            # Also try to test podman connectivity directly
-            if podman_available and not podman_socket_accessible:
-                try:
-                    # Try a simple podman command to see if it can connect
-                    test_result = subprocess.run(
-                        ['podman', 'ps', '--format', '{{.Names}}'],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    if test_result.returncode == 0:
-                        podman_socket_accessible = True
-                except:
-                    pass
+            podman_socket_accessible = cached_probe(
+                ('podman_socket', podman_available), probe_podman_socket, podman_available
+            )
 
             # Check journalctl availability and ability to actually execute
-            journalctl_available = False
-            journal_accessible = False
-            journalctl_binary_path = Path('/usr/bin/journalctl')
-            if journalctl_binary_path.exists() and os.access(journalctl_binary_path, os.X_OK):
-                # Actually try to execute it to see if it works (might fail due to missing libraries)
-                try:
-                    # Set LD_LIBRARY_PATH to help find systemd libraries
-                    env = os.environ.copy()
-                    env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
-                    journalctl_check = subprocess.run(
-                        ['/usr/bin/journalctl', '--version'],
-                        capture_output=True,
-                        text=True,
-                        timeout=2,
-                        env=env
-                    )
-                    journalctl_available = journalctl_check.returncode == 0
-                except:
-                    # Try without LD_LIBRARY_PATH
-                    try:
-                        journalctl_check = subprocess.run(
-                            ['/usr/bin/journalctl', '--version'],
-                            capture_output=True,
-                            text=True,
-                            timeout=2
-                        )
-                        journalctl_available = journalctl_check.returncode == 0
-                    except:
-                        pass
-            else:
-                # Fallback: try to run journalctl to see if it's in PATH
-                try:
-                    journalctl_check = subprocess.run(
-                        ['journalctl', '--version'],
-                        capture_output=True,
-                        text=True,
-                        timeout=1
-                    )
-                    journalctl_available = journalctl_check.returncode == 0
-                except:
-                    pass
+            journalctl_binary_path = JOURNALCTL_BINARY
+            journalctl_available = cached_probe('journalctl', probe_journalctl)
 
             # Check journal directory accessibility
             journal_paths = [
@@ -1854,14 +2700,7 @@ def get_logs():
                 Path('/run/log/journal'),
                 Path('/var/log/journal')
             ]
-            for journal_path in journal_paths:
-                if journal_path.exists():
-                    try:
-                        if os.access(journal_path, os.R_OK):
-                            journal_accessible = True
-                            break
-                    except:
-                        pass
+            journal_accessible = any(os.access(journal_path, os.R_OK) for journal_path in journal_paths)
 
             # Collect diagnostic information
             diagnostics = []
@@ -1879,117 +2718,29 @@ def get_logs():
             log_parts = []
             logs_retrieved = False
 
-            for service, container_name in containers.items():
-                log_parts.append(f"=== {service} ===")
-                container_logs = None
-                method_used = None
-
-                # Skip pod service if it has no direct container (we'll get its logs via journalctl only)
-                if container_name is None:
-                    # For pod service, only try journalctl
-                    if journalctl_available:
-                        try:
-                            # Set LD_LIBRARY_PATH for journalctl execution
-                            env = os.environ.copy()
-                            env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
-                            journal_result = subprocess.run(
-                                ['/usr/bin/journalctl', '-D', '/var/log/journal', '--system', '-u', service, '-n', str(lines // max(len(containers), 1)), '--no-pager', '--no-hostname'],
-                                capture_output=True,
-                                text=True,
-                                timeout=3,
-                                env=env
-                            )
-                            if journal_result.returncode == 0 and journal_result.stdout.strip():
-                                # Filter out UI/API log requests to prevent recursive noise
-                                raw_logs = journal_result.stdout.strip()
-                                filtered_log_lines = []
-                                for log_line in raw_logs.split('\n'):
-                                    # Skip lines that contain API log requests (they create recursive noise)
-                                    if '/api/logs' not in log_line and '/api/device-connections' not in log_line:
-                                        filtered_log_lines.append(log_line)
-                                container_logs = '\n'.join(filtered_log_lines) if filtered_log_lines else journal_result.stdout.strip()
-                                method_used = 'journalctl'
-                        except Exception as e:
-                            logging.exception(f"Exception while retrieving logs via journalctl for {service}")
-                            diagnostics.append(f"journalctl for {service} failed")
-                    if container_logs:
-                        log_parts.append(container_logs)
-                        logs_retrieved = True
-                    else:
-                        log_parts.append("Pod service logs (lifecycle events only)")
-                        log_parts.append("No recent pod lifecycle events.")
-                    log_parts.append("")
-                    continue
-
-                # Method 1: Try podman logs (works if podman socket is accessible)
-                if podman_available and podman_socket_accessible:
-                    try:
-                        # Set LD_LIBRARY_PATH for podman execution
-                        env = os.environ.copy()
-                        env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
-                        result = subprocess.run(
-                            ['/usr/bin/podman', 'logs', '--tail', str(lines // max(len(containers), 1)), container_name],
-                            capture_output=True,
-                            text=True,
-                            timeout=3,
-                            env=env
-                        )
-                        if result.returncode == 0 and result.stdout.strip():
-                            # Filter out UI/API log requests to prevent recursive noise
-                            raw_logs = result.stdout.strip()
-                            filtered_log_lines = []
-                            for log_line in raw_logs.split('\n'):
-                                # Skip lines that contain API log requests (they create recursive noise)
-                                if '/api/logs' not in log_line and '/api/device-connections' not in log_line:
-                                    filtered_log_lines.append(log_line)
-                            container_logs = '\n'.join(filtered_log_lines) if filtered_log_lines else result.stdout.strip()
-                            method_used = 'podman'
-                        elif result.returncode != 0:
-                            diagnostics.append(f"podman logs {container_name} returned code {result.returncode}: {result.stderr}")
-                    except FileNotFoundError:
-                        diagnostics.append(f"podman binary not found")
-                    except subprocess.TimeoutExpired:
-                        diagnostics.append(f"podman logs {container_name} timed out")
-                    except Exception as e:
-                        diagnostics.append(f"podman logs {container_name} failed: {str(e)}")
-
-                # Method 2: Try journalctl (works if journal is accessible)
-                if not container_logs and journalctl_available:
-                    try:
-                        # Set LD_LIBRARY_PATH for journalctl execution
-                        env = os.environ.copy()
-                        env['LD_LIBRARY_PATH'] = '/lib64:/usr/lib64:/usr/lib64/systemd'
-                        journal_result = subprocess.run(
-                            ['/usr/bin/journalctl', '-D', '/var/log/journal', '--system', '-u', service, '-n', str(lines // max(len(containers), 1)), '--no-pager', '--no-hostname'],
-                            capture_output=True,
-                            text=True,
-                            timeout=3,
-                            env=env
-                        )
-                        if journal_result.returncode == 0 and journal_result.stdout.strip():
-                            # Filter out UI/API log requests to prevent recursive noise
-                            raw_logs = journal_result.stdout.strip()
-                            filtered_log_lines = []
-                            for log_line in raw_logs.split('\n'):
-                                # Skip lines that contain API log requests (they create recursive noise)
-                                if '/api/logs' not in log_line and '/api/device-connections' not in log_line:
-                                    filtered_log_lines.append(log_line)
-                            container_logs = '\n'.join(filtered_log_lines) if filtered_log_lines else journal_result.stdout.strip()
-                            method_used = 'journalctl'
-                        elif journal_result.returncode != 0:
-                            diagnostics.append(f"journalctl -u {service} returned code {journal_result.returncode}: {journal_result.stderr}")
-                    except FileNotFoundError:
-                        diagnostics.append(f"journalctl binary not found")
-                    except subprocess.TimeoutExpired:
-                        diagnostics.append(f"journalctl -u {service} timed out")
-                    except Exception as e:
-                        diagnostics.append(f"journalctl -u {service} failed: {str(e)}")
+            per_service_lines = lines // max(len(containers), 1)
+            # The services are independent and each fetch mostly waits on a
+            # subprocess, so run them side by side on the shared pool
+            futures = [
+                log_fetch_executor.submit(
+                    fetch_service_logs, service, container_name, per_service_lines,
+                    podman_available and podman_socket_accessible, journalctl_available
+                )
+                for service, container_name in containers.items()
+            ]
+            results = [future.result() for future in futures]
 
+            for (service, container_name), (container_logs, method_used, service_diagnostics) in zip(containers.items(), results):
+                diagnostics.extend(service_diagnostics)
+                log_parts.append(f"=== {service} ===")
                 if container_logs:
                     log_parts.append(container_logs)
-                    if method_used:
+                    if method_used and container_name is not None:
                         log_parts.append(f"[Retrieved via {method_used}]")
                     logs_retrieved = True
+                elif container_name is None:
+                    log_parts.append("Pod service logs (lifecycle events only)")
+                    log_parts.append("No recent pod lifecycle events.")
                 else:
                     log_parts.append(f"Container: {container_name or 'N/A'}")
                     log_parts.append("Logs not available from within container.")
@@ -2000,16 +2751,14 @@ def get_logs():
                 # Only show help message if no logs were retrieved
                 if not logs_retrieved or "Logs not available from within container" in logs:
                     # Add diagnostic information
-                    logs = '\n' + '='*70 + '\n'
-                    logs += 'CONTAINER LOGS ACCESS DIAGNOSTICS\n'
-                    logs += '='*70 + '\n\n'
+                    # Collected as parts and joined once at the end
+                    help_parts = ['\n', LOG_HELP_SEPARATOR, 'CONTAINER LOGS ACCESS DIAGNOSTICS\n', LOG_HELP_SEPARATOR, '\n']
 
                     # Add diagnostics
                     if diagnostics:
-                        logs += 'Diagnostic Information:\n'
-                        for diag in diagnostics:
-                            logs += f'  - {diag}\n'
-                        logs += '\n'
+                        help_parts.append('Diagnostic Information:\n')
+                        help_parts.extend(f'  - {diag}\n' for diag in diagnostics)
+                        help_parts.append('\n')
 
                     # Try to get hostname for better instructions
                     import socket
@@ -2053,43 +2802,19 @@ def get_logs():
                         ssh_target = "the host server"
                         ssh_instruction = '  ssh user@<hostname-or-ip>  # Replace with actual hostname or IP'
 
-                    logs += 'Container logs require host-level access to systemd journal and podman.\n'
-                    logs += 'To view container logs, you need to SSH to the host server where this\n'
-                    logs += 'service is running and execute the commands below.\n\n'
-                    logs += f'SSH to {ssh_target}:\n'
-                    logs += f'{ssh_instruction}\n\n'
-                    logs += 'Once connected, run one of these commands:\n\n'
-
-                    # Build service-specific commands
-                    logs += 'Using journalctl (recommended):\n'
-                    if pod_service_exists:
-                        logs += '  sudo journalctl -u ztpbootstrap-pod.service -n 50 -f\n'
-                    if nginx_service_exists:
-                        logs += '  sudo journalctl -u ztpbootstrap-nginx.service -n 50 -f\n'
-                    if webui_service_exists:
-                        logs += '  sudo journalctl -u ztpbootstrap-webui.service -n 50 -f\n'
-                    logs += '\n'
-
-                    logs += 'Or using podman logs:\n'
-                    if nginx_service_exists:
-                        logs += '  sudo podman logs ztpbootstrap-nginx --tail 50 -f\n'
-                    if webui_service_exists:
-                        logs += '  sudo podman logs ztpbootstrap-webui --tail 50 -f\n'
-                    logs += '\n'
-
-                    logs += 'Note: The -f flag follows the logs in real-time. Remove it to see\n'
-                    logs += '      only the last N lines without following.\n'
-                    logs += '='*70 + '\n'
+                    # Only the SSH lines vary per request; the rest is pre-rendered per service combination
+                    help_template = LOG_HELP_TEMPLATES[(pod_service_exists, nginx_service_exists, webui_service_exists)]
+                    help_parts.append(help_template.format(ssh_target=ssh_target, ssh_instruction=ssh_instruction))
 
                     # Append the original log_parts if any
                     if log_parts and any("===" in part for part in log_parts):
-                        logs += '\n' + '\n'.join(log_parts)
+                        help_parts.append('\n')
+                        help_parts.append('\n'.join(log_parts))
+                    logs = ''.join(help_parts)
             else:
                 logs = 'Container logs are not available from within the container.'
                 if diagnostics:
-                    logs += '\n\nDiagnostic Information:\n'
-                    for diag in diagnostics:
-                        logs += f'  - {diag}\n'
+                    logs += '\n\nDiagnostic Information:\n' + ''.join(f'  - {diag}\n' for diag in diagnostics)
 
         if not logs:
             logs = 'No logs available'
@@ -2098,62 +2823,56 @@ def get_logs():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ?source= values for /api/logs/mark that select each log
+MARK_ACCESS_SOURCES = frozenset(('both', 'nginx_access', 'access'))
+MARK_ERROR_SOURCES = frozenset(('both', 'nginx_error', 'error'))
+
 @app.route('/api/logs/mark', methods=['POST'])
 @require_auth
 def mark_logs():
     """Insert a MARK line into the nginx logs"""
     try:
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
+        # gmtime keeps the UTC label true whatever the process time zone
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
         mark_line = f'===== MARK: {timestamp} =====\n'
+        # Encoded once and written to each log as is
+        mark_bytes = mark_line.encode('ascii')
 
         # Get which log source to mark (default to both)
         log_source = request.args.get('source', 'both')
         errors = []
 
-        # Write MARK to nginx access log
-        if log_source in ['both', 'nginx_access', 'access']:
-            if NGINX_ACCESS_LOG.exists():
-                try:
-                    with open(NGINX_ACCESS_LOG, 'a') as f:
-                        f.write(mark_line)
-                except Exception as e:
-                    errors.append(f'Failed to write MARK to access log: {str(e)}')
-            else:
-                # Try to write via podman exec
-                try:
-                    result = subprocess.run(
-                        ['podman', 'exec', 'ztpbootstrap-nginx', 'sh', '-c', f'echo "{mark_line.strip()}" >> /var/log/nginx/ztpbootstrap_access.log'],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode != 0:
-                        errors.append(f'Failed to write MARK to access log: {result.stderr}')
-                except Exception as e:
-                    errors.append(f'Failed to write MARK to access log: {str(e)}')
+        # (log kind, path inside the nginx container) for each log to mark
+        targets = []
+        if log_source in MARK_ACCESS_SOURCES:
+            targets.append(('access', '/var/log/nginx/ztpbootstrap_access.log'))
+        if log_source in MARK_ERROR_SOURCES:
+            targets.append(('error', '/var/log/nginx/ztpbootstrap_error.log'))
 
-        # Write MARK to nginx error log
-        if log_source in ['both', 'nginx_error', 'error']:
-            if NGINX_ERROR_LOG.exists():
-                try:
-                    with open(NGINX_ERROR_LOG, 'a') as f:
-                        f.write(mark_line)
-                except Exception as e:
-                    errors.append(f'Failed to write MARK to error log: {str(e)}')
-            else:
-                # Try to write via podman exec
-                try:
-                    result = subprocess.run(
-                        ['podman', 'exec', 'ztpbootstrap-nginx', 'sh', '-c', f'echo "{mark_line.strip()}" >> /var/log/nginx/ztpbootstrap_error.log'],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode != 0:
-                        errors.append(f'Failed to write MARK to error log: {result.stderr}')
-                except Exception as e:
-                    errors.append(f'Failed to write MARK to error log: {str(e)}')
+        # Write MARK directly to each log that is mounted here
+        exec_targets = []
+        for kind, container_path in targets:
+            try:
+                append_to_file(nginx_log_path(kind), mark_bytes)
+            except FileNotFoundError:
+                exec_targets.append((kind, container_path))
+            except Exception as e:
+                errors.append(f'Failed to write MARK to {kind} log: {str(e)}')
+
+        # Try to write the rest via podman exec, one exec for all of them
+        if exec_targets:
+            script = ' && '.join(f'echo "{mark_line.strip()}" >> {container_path}' for _, container_path in exec_targets)
+            try:
+                result = subprocess.run(
+                    ['podman', 'exec', 'ztpbootstrap-nginx', 'sh', '-c', script],
+                    capture_output=True,
+                    text=True,
+                    timeout=5
+                )
+                if result.returncode != 0:
+                    errors.extend(f'Failed to write MARK to {kind} log: {result.stderr}' for kind, _ in exec_targets)
+            except Exception as e:
+                errors.extend(f'Failed to write MARK to {kind} log: {str(e)}' for kind, _ in exec_targets)
 
         if errors:
             return jsonify({'error': '; '.join(errors)}), 500
@@ -2166,38 +2885,84 @@ def mark_logs():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Encoded /api/device-connections body as (access log signature, (expires_at, payload, etag))
+_device_connections_response = (None, None)
+DEVICE_CONNECTIONS_CACHE_TTL = 30
+
+def cached_device_connections_response(log_signature):
+    """Return (payload, etag) if the cached body is fresh for this log state, else None"""
+    cached_signature, cached_response = _device_connections_response
+    if cached_response is not None and cached_signature == log_signature and cached_response[0] > time.monotonic():
+        return cached_response[1:]
+    return None
+
+def device_connections_response(payload, etag):
+    """Serve an encoded device list, or 304 if the client already has it"""
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(payload, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
 @app.route('/api/device-connections')
 def get_device_connections():
     """Get device connection data"""
+    global _device_connections_response
+    # Started on first use rather than at import, so it runs in the process
+    # that serves requests
+    start_access_log_poller()
     try:
-        # Parse nginx logs to update connection data
-        connections = parse_nginx_access_log()
-
-        # Format for frontend
-        devices = []
-        for ip, data in connections.items():
-            # Calculate session duration
-            sessions = data.get('sessions', [])
-            total_duration = sum(s['end'] - s['start'] for s in sessions)
-            last_session_duration = sessions[-1]['end'] - sessions[-1]['start'] if sessions else 0
-
-            devices.append({
-                'ip': ip,
-                'first_seen': data['first_seen'],
-                'last_seen': data['last_seen'],
-                'bootstrap_downloaded': data.get('bootstrap_downloaded', False),
-                'bootstrap_download_time': data.get('bootstrap_download_time'),
-                'total_requests': data.get('total_requests', 0),
-                'total_sessions': len(sessions),
-                'total_duration': total_duration,
-                'last_session_duration': last_session_duration,
-                'user_agent': data.get('user_agent', 'Unknown')
-            })
+        # Polls while the access log is unchanged reuse the encoded response;
+        # it is still rebuilt every TTL so devices age out of the 24h window
+        log_signature = file_signature(nginx_log_path('access'))
+        cached = cached_device_connections_response(log_signature)
+        if cached is not None:
+            return device_connections_response(*cached)
+
+        # The connections dict is shared, so parse and format under the lock.
+        # Polls that queued behind another parse re-check the cache first and
+        # reuse its result instead of parsing again.
+        with device_connections_lock:
+            log_signature = file_signature(nginx_log_path('access'))
+            cached = cached_device_connections_response(log_signature)
+            if cached is not None:
+                return device_connections_response(*cached)
+
+            # Parse nginx logs to update connection data
+            connections = parse_nginx_access_log()
+
+            # Format for frontend
+            devices = []
+            for ip, data in connections.items():
+                # Calculate session durations in one pass; the last one seen is the latest session
+                sessions = data.get('sessions', [])
+                total_duration = 0
+                last_session_duration = 0
+                for s in sessions:
+                    last_session_duration = s['end'] - s['start']
+                    total_duration += last_session_duration
+
+                devices.append({
+                    'ip': ip,
+                    'first_seen': data['first_seen'],
+                    'last_seen': data['last_seen'],
+                    'bootstrap_downloaded': data.get('bootstrap_downloaded', False),
+                    'bootstrap_download_time': data.get('bootstrap_download_time'),
+                    'total_requests': data.get('total_requests', 0),
+                    'total_sessions': len(sessions),
+                    'total_duration': total_duration,
+                    'last_session_duration': last_session_duration,
+                    'user_agent': data.get('user_agent', 'Unknown')
+                })
 
-        # Sort by last seen (most recent first)
-        devices.sort(key=lambda x: x['last_seen'], reverse=True)
+            # Sort by last seen (most recent first)
+            devices.sort(key=operator.itemgetter('last_seen'), reverse=True)
 
-        return jsonify({'devices': devices})
+            payload = app.json.dumps({'devices': devices})
+            etag = hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+            _device_connections_response = (log_signature, (time.monotonic() + DEVICE_CONNECTIONS_CACHE_TTL, payload, etag))
+        return device_connections_response(payload, etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
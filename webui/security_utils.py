@@ -3,10 +3,16 @@
 Security utility functions for the ZTP Bootstrap Web UI
 """
 
+import functools
 import os
 import re
 from pathlib import Path
 
+# Allowed bootstrap script names: alphanumeric, dots, underscores and hyphens,
+# starting with 'bootstrap' and ending with '.py'. The lookahead rejects '..'
+# and \Z (unlike $) refuses a trailing newline. Compiled once at import.
+BOOTSTRAP_FILENAME_RE = re.compile(r'^(?!.*\.\.)bootstrap[a-zA-Z0-9_.-]{0,120}\.py\Z')
+
 
 def sanitize_filename(filename):
     """
@@ -29,18 +35,32 @@ def sanitize_filename(filename):
     
     # Only allow alphanumeric, dots, underscores, and hyphens
     # Must start with 'bootstrap' and end with '.py'
-    if not re.match(r'^bootstrap[a-zA-Z0-9_.-]*\.py$', filename):
+    # Path separators and null bytes are outside the allowed character set,
+    # and '..' is rejected by the pattern itself
+    if not BOOTSTRAP_FILENAME_RE.match(filename):
         return None
     
-    # Prevent dangerous patterns
-    dangerous_patterns = ['..', '/', '\\', '\0']
-    for pattern in dangerous_patterns:
-        if pattern in filename:
-            return None
-    
     return filename
 
 
+@functools.lru_cache(maxsize=8)
+def resolve_base_directory(base_directory):
+    """
+    Resolve a base directory once and cache the result.
+    
+    Base directories come from trusted configuration and don't move while the
+    application is running, so there is no need to walk their symlinks again
+    for every validated filename.
+    
+    Args:
+        base_directory: The base directory Path
+        
+    Returns:
+        The resolved base directory Path
+    """
+    return base_directory.resolve()
+
+
 def validate_path_in_directory(file_path, base_directory):
     """
     Validate that a file path is within the base directory (prevents path traversal).
@@ -64,7 +84,7 @@ def validate_path_in_directory(file_path, base_directory):
         # CodeQL: file_path is validated before calling this function via safe_path_join()
         # The path is guaranteed to be within base_directory by the caller
         resolved_path = file_path.resolve()
-        resolved_base = base_directory.resolve()
+        resolved_base = resolve_base_directory(base_directory)
         
         # Use Path.is_relative_to if available (Python 3.9+)
         # This is the most reliable way to check path containment
@@ -46,5 +46,32 @@ export FLASK_ENV="${FLASK_ENV:-production}"
 # Wait a moment for any initialization
 sleep 2
 
+# Start the web UI under gunicorn (installed from requirements.txt) so requests
+# are served from a thread pool. A single worker process is used because the
+# device tracking state (access log cursor, in-memory connections) is kept per
+# process. Set WEBUI_SERVER=flask to run the Flask development server instead.
+# WEBUI_WORKER_CLASS may be gthread (default) or sync. Async workers such as
+# gevent are not supported: the app runs its own OS threads (access log
+# poller, log fetch pool) and is not monkey-patched.
+WEBUI_WORKER_CLASS="${WEBUI_WORKER_CLASS:-gthread}"
+WEBUI_THREADS="${WEBUI_THREADS:-4}"
+case "$WEBUI_WORKER_CLASS" in
+    gthread) ;;
+    # gunicorn silently switches sync to gthread when --threads is above 1
+    sync) WEBUI_THREADS=1 ;;
+    *)
+        echo "Error: Unsupported WEBUI_WORKER_CLASS '$WEBUI_WORKER_CLASS' (use gthread or sync)"
+        exit 1
+        ;;
+esac
+if [ "${WEBUI_SERVER:-gunicorn}" = "gunicorn" ] && python3 -c "import gunicorn" 2>/dev/null; then
+    exec python3 -m gunicorn \
+        --workers 1 \
+        --worker-class "$WEBUI_WORKER_CLASS" \
+        --threads "$WEBUI_THREADS" \
+        --bind 0.0.0.0:5000 \
+        app:app
+fi
+
 # Start Flask app
 exec python3 app.py